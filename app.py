@@ -5,44 +5,96 @@ Main application entry point with integrated services
 """
 
 import os
+import re
+import atexit
+import queue
+import itertools
+import hashlib
 import logging
+import logging.handlers
 import time
 import threading
-import shutil
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from flask import Flask, render_template, request, jsonify, session, redirect, url_for
-from werkzeug.utils import secure_filename
-from dotenv import load_dotenv
-import secrets
-import logging
-import time
-from flask import Flask, render_template, request, jsonify, session, redirect, url_for
-from werkzeug.utils import secure_filename
+from flask.json.provider import DefaultJSONProvider
 from dotenv import load_dotenv
+from flask_session import Session
+from jinja2 import FileSystemBytecodeCache
+import orjson
+from markupsafe import escape
 import secrets
 
 # Import our services
 from src.coupons import CouponManager
 from src.data import CSVManager
-from src.auth import GoogleAuthService, GmailEmailService
+from src.auth import GoogleAuthService, GmailEmailService, TOKEN_REFRESH_LEEWAY
 
 # Load environment variables
 load_dotenv()
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
+# Configure logging: request and send threads only enqueue records, a listener thread does the I/O
+log_queue = queue.Queue(-1)
+log_stream_handler = logging.StreamHandler()
+log_stream_handler.setFormatter(logging.Formatter(logging.BASIC_FORMAT))
+log_listener = logging.handlers.QueueListener(log_queue, log_stream_handler)
+log_listener.start()
+atexit.register(log_listener.stop)
+log_queue_handler = logging.handlers.QueueHandler(log_queue)
+log_queue_handler.setFormatter(logging.Formatter('%(message)s'))
+logging.basicConfig(level=logging.INFO, handlers=[log_queue_handler])
 logger = logging.getLogger(__name__)
 
+class ORJSONProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson for faster serialization of large responses"""
+    
+    def _dumps_bytes(self, obj, indent=False) -> bytes:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        # Dates, decimals and similar types fall back to Flask's default conversions
+        return orjson.dumps(obj, default=self.default, option=option)
+    
+    def dumps(self, obj, **kwargs):
+        return self._dumps_bytes(obj, indent=bool(kwargs.get('indent'))).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        """Build a JSON response from orjson's bytes without a str round trip"""
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self._dumps_bytes(obj, indent) + b'\n', mimetype=self.mimetype)
+
+
 # Initialize Flask application
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 
 # Configuration
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production')
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
-app.config['UPLOAD_FOLDER'] = 'uploads'
+# Behind nginx/Apache, let the web server stream file downloads instead of Python
+app.config['USE_X_SENDFILE'] = os.environ.get('USE_X_SENDFILE', 'False').lower() == 'true'
 
-# Ensure upload directory exists
-os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+# Compile templates once: keep compiled bytecode on disk across workers and skip mtime checks outside debug
+app.config['TEMPLATES_AUTO_RELOAD'] = os.environ.get('FLASK_DEBUG', 'False').lower() == 'true'
+app.jinja_options = {**app.jinja_options, 'bytecode_cache': FileSystemBytecodeCache(), 'cache_size': 400}
+
+# Keep session data (OAuth tokens, user info) server-side; the cookie only carries the session id
+redis_url = os.environ.get('REDIS_URL')
+if redis_url:
+    import redis
+    app.config['SESSION_TYPE'] = 'redis'
+    app.config['SESSION_REDIS'] = redis.from_url(redis_url)
+else:
+    from cachelib.file import FileSystemCache
+    app.config['SESSION_TYPE'] = 'cachelib'
+    app.config['SESSION_CACHELIB'] = FileSystemCache(cache_dir=os.environ.get('SESSION_FILE_DIR', 'flask_session'))
+Session(app)
 
 # Initialize services
 try:
@@ -56,6 +108,9 @@ except Exception as e:
     coupon_manager = None
     google_auth_service = None
 
+# Services are created together at startup, so readiness only needs to be checked once
+SERVICES_READY = all(service is not None for service in (csv_manager, coupon_manager, google_auth_service))
+
 # Authentication helper functions
 def login_required(f):
     """Decorator to require Google authentication"""
@@ -71,6 +126,49 @@ def get_current_user():
     """Get current authenticated user from session"""
     return session.get('user')
 
+# Gmail services cached per access token so API clients and connections are reused
+GMAIL_SERVICE_CACHE_TTL = 50 * 60  # Drop services that have not been used for this long
+gmail_service_cache = {}
+gmail_service_cache_lock = threading.Lock()
+
+def _gmail_service_usable(gmail_service, last_used, now):
+    """Check whether a cached GmailEmailService can still send without rebuilding"""
+    if now - last_used >= GMAIL_SERVICE_CACHE_TTL:
+        return False
+    
+    credentials = gmail_service.credentials
+    # Services holding a refresh token renew their own access token when it is about to expire
+    if credentials.refresh_token or credentials.expiry is None:
+        return True
+    return credentials.expiry - datetime.utcnow() > TOKEN_REFRESH_LEEWAY
+
+def get_gmail_service(oauth_tokens):
+    """Get a cached GmailEmailService for the given OAuth tokens, or None"""
+    # Key on the user's refresh token so the cached service survives access token refreshes
+    grant_token = oauth_tokens.get('refresh_token') or oauth_tokens.get('access_token') or ''
+    cache_key = hashlib.sha256(grant_token.encode()).hexdigest()
+    now = time.time()
+    
+    with gmail_service_cache_lock:
+        cached = gmail_service_cache.get(cache_key)
+        if cached and _gmail_service_usable(cached[0], cached[1], now):
+            gmail_service_cache[cache_key] = (cached[0], now)
+            return cached[0]
+    
+    credentials = google_auth_service.create_credentials_from_session(oauth_tokens)
+    if not credentials:
+        return None
+    
+    gmail_service = GmailEmailService(credentials)
+    with gmail_service_cache_lock:
+        # Evict services that went idle or whose tokens have expired
+        for key, (service, last_used) in list(gmail_service_cache.items()):
+            if not _gmail_service_usable(service, last_used, now):
+                del gmail_service_cache[key]
+        gmail_service_cache[cache_key] = (gmail_service, now)
+    
+    return gmail_service
+
 # Authentication routes
 @app.route('/login')
 def login():
@@ -138,7 +236,8 @@ def auth_callback():
             'token_uri': token_data['token_uri'],
             'client_id': token_data['client_id'],
             'client_secret': token_data['client_secret'],
-            'scopes': token_data['scopes']
+            'scopes': token_data['scopes'],
+            'expiry': token_data['expiry']
         }
         
         # Clear state and redirect URI
@@ -180,62 +279,116 @@ def scanner():
     """QR scanner interface route - no authentication required"""
     return render_template('scanner.html')
 
-# API endpoints
-@app.route('/send-emails', methods=['POST'])
-@login_required
-def send_emails():
-    """Send email campaign with coupon generation using authenticated user's Gmail"""
-    if not all([coupon_manager, csv_manager, google_auth_service]):
-        return jsonify({'success': False, 'error': 'Services not initialized'}), 500
+# Background email campaigns
+campaign_executor = ThreadPoolExecutor(max_workers=2)
+campaign_jobs = {}
+campaign_jobs_lock = threading.Lock()
+
+# Seconds a finished campaign stays available to status polls before it is evicted
+CAMPAIGN_JOB_TTL = int(os.environ.get('CAMPAIGN_JOB_TTL', '3600'))
+
+# Thank-you emails sent after scans; a bounded pool keeps a burst of scans from spawning unbounded threads
+thank_you_executor = ThreadPoolExecutor(max_workers=int(os.environ.get('THANKYOU_WORKERS', '8')),
+                                        thread_name_prefix='thankyou')
+
+# Compiled once at startup; scans only render it
+thank_you_template = app.jinja_env.get_template('thank_you.html')
+
+# Per-recipient fields substituted into the pre-rendered campaign email
+CAMPAIGN_TEMPLATE_FIELDS = ('email', 'coupon_id', 'qr_code_base64', 'verification_code')
+
+# Recipients are streamed from the CSV and turned into coupons this many at a time
+CAMPAIGN_COUPON_BATCH_SIZE = 500
+
+# Largest recipient list a single campaign will accept
+MAX_CAMPAIGN_SIZE = int(os.environ.get('MAX_CAMPAIGN_SIZE', '100000'))
+
+# Gmail send tuning: emails per batch HTTP request (max 100) and batch requests in flight
+GMAIL_BATCH_SIZE = int(os.environ.get('GMAIL_BATCH_SIZE', GmailEmailService.BATCH_SIZE))
+GMAIL_MAX_WORKERS = int(os.environ.get('GMAIL_MAX_WORKERS', GmailEmailService.MAX_CONCURRENT_BATCHES))
+
+def _compile_campaign_template(template_name, base_context):
+    """Render a campaign template once and return a fast per-recipient renderer"""
+    template = app.jinja_env.get_template(template_name)
+    placeholders = {field: f'@@{field}@@' for field in CAMPAIGN_TEMPLATE_FIELDS}
+    rendered = template.render({**base_context, **placeholders})
+    
+    # Odd-indexed parts are field names, even-indexed parts are literal HTML
+    parts = re.split(r'@@(' + '|'.join(CAMPAIGN_TEMPLATE_FIELDS) + r')@@', rendered)
+    
+    def template_renderer(_template_name, context):
+        # The template branches on verification_code, so only reuse the pre-render when it's set
+        if not context.get('verification_code'):
+            return template.render({**base_context, **context})
+        
+        return ''.join(
+            part if i % 2 == 0 else str(escape(context.get(part, '')))
+            for i, part in enumerate(parts)
+        )
+    
+    return template_renderer
+
+def _update_campaign_job(job_id, **changes):
+    """Publish a new copy of a job so status polls never see it half-updated"""
+    with campaign_jobs_lock:
+        job = {**campaign_jobs[job_id], **changes}
+        if job['status'] in ('completed', 'failed'):
+            job['finished_at'] = time.monotonic()
+        campaign_jobs[job_id] = job
+
+def _prune_campaign_jobs(now):
+    """Drop finished jobs older than CAMPAIGN_JOB_TTL; caller holds campaign_jobs_lock"""
+    expired = [job_id for job_id, job in campaign_jobs.items()
+               if job.get('finished_at') is not None and now - job['finished_at'] > CAMPAIGN_JOB_TTL]
+    for job_id in expired:
+        del campaign_jobs[job_id]
+
+def _run_campaign(job_id, user, oauth_tokens, gmail_service, event_name):
+    """Generate coupons and send the campaign emails for a queued job"""
+    _update_campaign_job(job_id, status='running')
     
     try:
-        # Get current user and their OAuth tokens
-        user = get_current_user()
-        oauth_tokens = session.get('oauth_tokens')
-        
-        if not user or not oauth_tokens:
-            return jsonify({'success': False, 'error': 'User not authenticated'}), 401
-        
-        # Create Gmail service with user's credentials
-        credentials = google_auth_service.create_credentials_from_session(oauth_tokens)
-        if not credentials:
-            return jsonify({'success': False, 'error': 'Failed to create credentials'}), 401
-        
-        gmail_service = GmailEmailService(credentials)
-        
-        data = request.get_json()
-        event_name = data.get('event_name', 'Special Event')
-        # Read recipients from CSV
-        recipients = csv_manager.read_recipients()
-        if not recipients:
-            return jsonify({'success': False, 'error': 'No recipients found'}), 400
-        
-        # Generate coupons for all recipients
-        logger.info(f"Generating coupons for {len(recipients)} recipients")
-        coupon_results = coupon_manager.generate_coupons_batch(recipients, event_name)
+        # Generate coupons batch by batch while streaming recipients from the CSV
+        coupon_results = {'generated': 0, 'coupons': []}
+        total_recipients = 0
+        recipient_rows = csv_manager.iter_recipients()
+        while True:
+            batch = list(itertools.islice(recipient_rows, CAMPAIGN_COUPON_BATCH_SIZE))
+            if not batch:
+                break
+            total_recipients += len(batch)
+            batch_results = coupon_manager.generate_coupons_batch(batch, event_name)
+            coupon_results['generated'] += batch_results['generated']
+            coupon_results['coupons'].extend(batch_results['coupons'])
+        logger.info(f"Generated coupons for {total_recipients} recipients")
         
         if coupon_results['generated'] == 0:
-            return jsonify({'success': False, 'error': 'Failed to generate any coupons'}), 500
-        
-        # Prepare email data with coupon information
-        email_recipients = []
-        for coupon in coupon_results['coupons']:
-            email_recipients.append({
-                'email': coupon['email'],
-                'coupon_id': coupon['coupon_id'],
-                'event_name': coupon['event_name'],
-                'qr_code_base64': coupon['qr_code_base64'],
-                'verification_code': coupon['verification_code'],  # Include 6-digit code
-                'subject': f'Your Digital Coupon for {event_name}'
-            })
+            _update_campaign_job(job_id, status='failed', error='Failed to generate any coupons')
+            return
+        
+        # Prepare email data with coupon information; the subject is the same for every recipient
+        subject = f'Your Digital Coupon for {event_name}'
+        email_recipients = [{
+            'email': coupon['email'],
+            'coupon_id': coupon['coupon_id'],
+            'event_name': coupon['event_name'],
+            'qr_code_base64': coupon['qr_code_base64'],
+            'verification_code': coupon['verification_code'],  # Include 6-digit code
+            'subject': subject
+        } for coupon in coupon_results['coupons']]
         
         # Send emails with progress tracking using Gmail API
         def progress_callback(progress):
-            logger.info(f"Gmail email progress: {progress['current']}/{progress['total']}")
+            _update_campaign_job(job_id, progress={
+                'current': progress['current'],
+                'total': progress['total'],
+                'sent': progress['sent'],
+                'failed': progress['failed']
+            })
+            logger.debug(f"Gmail email progress: {progress['current']}/{progress['total']}")
         
-        # Create template renderer function
-        def template_renderer(template_name, context):
-            return render_template(template_name, **context)
+        # Render the email template once for the whole campaign
+        template_renderer = _compile_campaign_template('event.html', {'event_name': event_name})
         
         sender_email = user['email']
         logger.info(f"Sending emails from {sender_email} to {len(email_recipients)} recipients via Gmail API")
@@ -244,21 +397,28 @@ def send_emails():
             sender_email, 
             email_recipients, 
             template_renderer,
-            progress_callback
+            progress_callback,
+            batch_size=GMAIL_BATCH_SIZE,
+            max_workers=GMAIL_MAX_WORKERS
         )
         
-        # Update coupon status for successfully sent emails
+        # Collect coupons for successfully sent emails
         successful_emails = []
         failed_emails = []
+        sent_coupon_ids = []
+        
+        # Index coupons by email once; setdefault keeps the first match like the old linear search
+        coupon_by_email = {}
+        for coupon in coupon_results['coupons']:
+            coupon_by_email.setdefault(coupon['email'], coupon)
         
         for result in email_results['results']:
             if result.success:
                 successful_emails.append(result.recipient)
-                # Find the coupon for this recipient and mark as sent
-                for coupon in coupon_results['coupons']:
-                    if coupon['email'] == result.recipient:
-                        coupon_manager.mark_coupon_sent(coupon['coupon_id'])
-                        break
+                # Find the coupon for this recipient
+                coupon = coupon_by_email.get(result.recipient)
+                if coupon:
+                    sent_coupon_ids.append(coupon['coupon_id'])
             else:
                 failed_emails.append({
                     'email': result.recipient,
@@ -266,6 +426,10 @@ def send_emails():
                     'timestamp': result.timestamp
                 })
         
+        # Mark all sent coupons in a single coupons file rewrite
+        if sent_coupon_ids:
+            coupon_manager.mark_coupons_sent(sent_coupon_ids)
+        
         # Save failed emails to CSV if any failures occurred
         failure_log_file = None
         if failed_emails:
@@ -275,29 +439,120 @@ def send_emails():
         # Save organizer credentials for thank you emails during verification
         csv_manager.save_organizer_credentials(user, oauth_tokens, event_name)
         
-        # Update OAuth tokens in session if they were refreshed
+        # Hand refreshed OAuth tokens back to the session on the next status poll
+        token_changes = {}
         updated_credentials = gmail_service.credentials
         if updated_credentials.token != oauth_tokens.get('access_token'):
-            session['oauth_tokens']['access_token'] = updated_credentials.token
+            token_changes['access_token'] = updated_credentials.token
+            token_changes['expiry'] = updated_credentials.expiry.isoformat() if updated_credentials.expiry else None
         
-        return jsonify({
+        result = {
             'success': True,
             'sender_email': sender_email,
             'coupons_generated': coupon_results['generated'],
             'emails_sent': email_results['sent'],
             'emails_failed': email_results['failed'],
-            'total_recipients': len(recipients),
+            'total_recipients': total_recipients,
             'successful_emails': successful_emails,
             'failed_emails': failed_emails,
             'failure_log_file': failure_log_file,
             'start_time': email_results['start_time'],
             'end_time': email_results['end_time']
-        })
+        }
+        _update_campaign_job(job_id, status='completed', result=result, **token_changes)
+        
+    except Exception as e:
+        logger.error(f"Error in campaign {job_id}: {str(e)}")
+        _update_campaign_job(job_id, status='failed', error=str(e))
+
+# API endpoints
+@app.route('/send-emails', methods=['POST'])
+@login_required
+def send_emails():
+    """Queue an email campaign with coupon generation using authenticated user's Gmail"""
+    if not SERVICES_READY:
+        return jsonify({'success': False, 'error': 'Services not initialized'}), 500
+    
+    try:
+        # Get current user and their OAuth tokens
+        user = get_current_user()
+        oauth_tokens = session.get('oauth_tokens')
+        
+        if not user or not oauth_tokens:
+            return jsonify({'success': False, 'error': 'User not authenticated'}), 401
+        
+        # Get Gmail service with user's credentials
+        gmail_service = get_gmail_service(oauth_tokens)
+        if not gmail_service:
+            return jsonify({'success': False, 'error': 'Failed to create credentials'}), 401
+        
+        data = request.get_json()
+        event_name = data.get('event_name', 'Special Event')
+        # Count recipients up front; the campaign streams the rows itself
+        recipients_count = csv_manager.count_recipients()
+        if not recipients_count:
+            return jsonify({'success': False, 'error': 'No recipients found'}), 400
+        if recipients_count > MAX_CAMPAIGN_SIZE:
+            return jsonify({'success': False, 'error': 'Recipient count exceeds limit'}), 413
+        
+        # Run the campaign in the background and let the client poll for progress
+        job_id = secrets.token_hex(8)
+        with campaign_jobs_lock:
+            _prune_campaign_jobs(time.monotonic())
+            campaign_jobs[job_id] = {
+                'owner': user['email'],
+                'event_name': event_name,
+                'status': 'queued',
+                'progress': {'current': 0, 'total': recipients_count, 'sent': 0, 'failed': 0},
+                'result': None,
+                'error': None
+            }
+        
+        campaign_executor.submit(_run_campaign, job_id, user, dict(oauth_tokens),
+                                 gmail_service, event_name)
+        logger.info(f"Queued campaign {job_id} for {recipients_count} recipients")
+        
+        return jsonify({
+            'success': True,
+            'job_id': job_id,
+            'status': 'queued',
+            'total_recipients': recipients_count
+        }), 202
         
     except Exception as e:
         logger.error(f"Error in send_emails: {str(e)}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/send-emails/status/<job_id>')
+@login_required
+def send_emails_status(job_id):
+    """Get progress and result of a queued email campaign"""
+    # Jobs are replaced rather than mutated, so this snapshot stays consistent
+    with campaign_jobs_lock:
+        job = campaign_jobs.get(job_id)
+    user = get_current_user()
+    
+    if not job or job['owner'] != user.get('email'):
+        return jsonify({'success': False, 'error': 'Campaign not found'}), 404
+    
+    # Update OAuth tokens in session if they were refreshed during sending
+    access_token = job.get('access_token')
+    oauth_tokens = session.get('oauth_tokens')
+    if access_token and oauth_tokens and oauth_tokens.get('access_token') != access_token:
+        oauth_tokens['access_token'] = access_token
+        oauth_tokens['expiry'] = job.get('expiry')
+        session['oauth_tokens'] = oauth_tokens
+    
+    return jsonify({
+        'success': True,
+        'job_id': job_id,
+        'event_name': job['event_name'],
+        'status': job['status'],
+        'progress': job['progress'],
+        'result': job['result'],
+        'error': job['error']
+    })
+
 @app.route('/verify-coupon', methods=['POST'])
 def verify_coupon():
     """Verify QR coupon or verification code and mark as used"""
@@ -346,10 +601,9 @@ def verify_coupon():
                     organizer_data = csv_manager.get_organizer_credentials()
                     
                     if organizer_data and google_auth_service:
-                        # Create Gmail service with organizer's credentials
-                        credentials = google_auth_service.create_credentials_from_session(organizer_data['oauth_tokens'])
-                        if credentials:
-                            gmail_service = GmailEmailService(credentials)
+                        # Get Gmail service with organizer's credentials
+                        gmail_service = get_gmail_service(organizer_data['oauth_tokens'])
+                        if gmail_service:
                             
                             # Prepare thank you email data
                             attendance_data = {
@@ -363,9 +617,8 @@ def verify_coupon():
                                 'current_date': time.strftime('%Y-%m-%d %H:%M:%S')
                             }
                             
-                            # Render thank you email template in app context
-                            with app.app_context():
-                                html_content = render_template('thank_you.html', **attendance_data)
+                            # Render the precompiled thank you email template
+                            html_content = thank_you_template.render(attendance_data)
                             
                             subject = f"Thank you for attending {attendance_data['event_name']}!"
                             sender_email = organizer_data['user_info']['email']
@@ -387,10 +640,8 @@ def verify_coupon():
                     import traceback
                     logger.error(traceback.format_exc())
             
-            # Start email sending in background thread
-            email_thread = threading.Thread(target=send_thank_you_async)
-            email_thread.daemon = True
-            email_thread.start()
+            # Send the email on the background thank-you pool
+            thank_you_executor.submit(send_thank_you_async)
             
             # Return immediately without waiting for email
             return jsonify({
@@ -467,16 +718,11 @@ def upload_csv():
         data = request.form
         reset_coupons = data.get('reset_coupons', 'false').lower() == 'true'
         
-        # Save uploaded file
-        filename = secure_filename(file.filename)
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
-        
-        # Validate the CSV file
-        validation_result = csv_manager.validate_recipients_file(filepath)
+        # Read the upload once and validate it in memory
+        content = file.stream.read()
+        validation_result = csv_manager.validate_recipients_content(content)
         
         if not validation_result['valid']:
-            os.remove(filepath)  # Clean up invalid file
             return jsonify({
                 'success': False,
                 'error': 'Invalid CSV file',
@@ -489,7 +735,7 @@ def upload_csv():
             backup_created = csv_manager.backup_current_data()
         
         # If valid, replace the current recipients file
-        shutil.move(filepath, csv_manager.recipients_file)
+        csv_manager.replace_recipients_file(content)
         
         # Reset coupons if requested (for fresh campaign)
         coupons_reset = False
@@ -539,12 +785,12 @@ def get_stats():
     
     try:
         coupon_stats = csv_manager.get_coupon_stats()
-        recipients = csv_manager.read_recipients()
+        recipients_count = csv_manager.count_recipients()
         user = get_current_user()
         
         return jsonify({
             'success': True,
-            'recipients_count': len(recipients),
+            'recipients_count': recipients_count,
             'coupon_stats': coupon_stats,
             'user_email': user.get('email') if user else None
         })
@@ -557,35 +803,22 @@ def get_stats():
 @login_required
 def get_recipients():
     """Get detailed recipient list with status markers"""
-    if not all([csv_manager, coupon_manager]):
+    if not SERVICES_READY:
         return jsonify({'success': False, 'error': 'Services not initialized'}), 500
     
     try:
         # Get all recipients from CSV
         recipients = csv_manager.read_recipients()
         
-        # Get all coupons to match with recipients
-        coupon_stats = csv_manager.get_coupon_stats()
+        # Index all coupons by email once instead of rescanning per recipient
+        coupon_index = csv_manager.load_coupon_index()
         
         # Create detailed recipient list with status
         detailed_recipients = []
         
         for recipient in recipients:
-            email = recipient['email'].lower()
-            
             # Find matching coupon for this recipient
-            coupon_record = None
-            try:
-                # This is a simplified approach - in a real system you'd want a more efficient lookup
-                import csv as csv_module
-                with open(csv_manager.coupons_file, 'r', newline='', encoding='utf-8') as f:
-                    reader = csv_module.DictReader(f)
-                    for row in reader:
-                        if row.get('email', '').lower() == email:
-                            coupon_record = row
-                            break
-            except:
-                pass
+            coupon_record = coupon_index.get(recipient['email_lc'])
             
             # Determine status
             status = 'pending'  # Default status
@@ -628,6 +861,10 @@ def preview_send():
         data = request.get_json()
         event_name = data.get('event_name', 'Special Event')
         
+        # Reject oversized lists from the cached count before parsing every row
+        if csv_manager.count_recipients() > MAX_CAMPAIGN_SIZE:
+            return jsonify({'success': False, 'error': 'Recipient count exceeds limit'}), 413
+        
         # Read recipients from CSV
         recipients = csv_manager.read_recipients()
         if not recipients:
@@ -636,25 +873,21 @@ def preview_send():
         # Filter out recipients who already have tickets (optional)
         include_existing = data.get('include_existing', True)
         
+        # Index all coupons by email once instead of rescanning per recipient
+        coupon_index = csv_manager.load_coupon_index()
+        
         preview_recipients = []
+        new_count = 0
+        existing_count = 0
         for recipient in recipients:
-            email = recipient['email'].lower()
-            
             # Check if recipient already has a ticket
             has_ticket = False
             ticket_status = 'new'
             
-            try:
-                import csv as csv_module
-                with open(csv_manager.coupons_file, 'r', newline='', encoding='utf-8') as f:
-                    reader = csv_module.DictReader(f)
-                    for row in reader:
-                        if row.get('email', '').lower() == email:
-                            has_ticket = True
-                            ticket_status = row.get('status', 'generated')
-                            break
-            except:
-                pass
+            coupon_record = coupon_index.get(recipient['email_lc'])
+            if coupon_record:
+                has_ticket = True
+                ticket_status = coupon_record.get('status', 'generated')
             
             # Include based on filter
             if include_existing or not has_ticket:
@@ -663,14 +896,18 @@ def preview_send():
                     'has_existing_ticket': has_ticket,
                     'ticket_status': ticket_status
                 })
+                if has_ticket:
+                    existing_count += 1
+                else:
+                    new_count += 1
         
         return jsonify({
             'success': True,
             'event_name': event_name,
             'recipients': preview_recipients,
             'total_count': len(preview_recipients),
-            'new_recipients': len([r for r in preview_recipients if not r['has_existing_ticket']]),
-            'existing_recipients': len([r for r in preview_recipients if r['has_existing_ticket']])
+            'new_recipients': new_count,
+            'existing_recipients': existing_count
         })
         
     except Exception as e:
@@ -686,24 +923,26 @@ def get_failed_emails_logs():
         if not os.path.exists(logs_dir):
             return jsonify({'success': True, 'logs': []})
         
-        log_files = []
-        for filename in os.listdir(logs_dir):
-            if filename.startswith('failed_emails_') and filename.endswith('.csv'):
-                filepath = os.path.join(logs_dir, filename)
-                stat = os.stat(filepath)
-                log_files.append({
+        log_entries = []
+        with os.scandir(logs_dir) as entries:
+            for entry in entries:
+                filename = entry.name
+                if not (filename.startswith('failed_emails_') and filename.endswith('.csv')):
+                    continue
+                stat = entry.stat()
+                log_entries.append((stat.st_ctime, {
                     'filename': filename,
-                    'filepath': filepath,
+                    'filepath': entry.path,
                     'size': stat.st_size,
                     'created': datetime.fromtimestamp(stat.st_ctime).strftime('%Y-%m-%d %H:%M:%S')
-                })
+                }))
         
-        # Sort by creation time, newest first
-        log_files.sort(key=lambda x: x['created'], reverse=True)
+        # Sort by raw creation time, newest first
+        log_entries.sort(key=lambda item: item[0], reverse=True)
         
         return jsonify({
             'success': True,
-            'logs': log_files
+            'logs': [log_file for _, log_file in log_entries]
         })
         
     except Exception as e:
@@ -719,12 +958,14 @@ def download_failed_emails(filename):
         if not filename.startswith('failed_emails_') or not filename.endswith('.csv'):
             return jsonify({'error': 'Invalid filename'}), 400
         
-        filepath = os.path.join('logs', filename)
+        # Logs are written relative to the working directory; resolve them the same way here
+        filepath = os.path.abspath(os.path.join('logs', filename))
         if not os.path.exists(filepath):
             return jsonify({'error': 'File not found'}), 404
         
         from flask import send_file
-        return send_file(filepath, as_attachment=True, download_name=filename)
+        # Conditional responses let clients resume or revalidate downloads with Range/If-Modified-Since
+        return send_file(filepath, as_attachment=True, download_name=filename, conditional=True)
         
     except Exception as e:
         logger.error(f"Error downloading failed emails file: {str(e)}")
@@ -744,6 +985,9 @@ if __name__ == '__main__':
     debug_mode = os.environ.get('FLASK_DEBUG', 'False').lower() == 'true'
     port = int(os.environ.get('PORT', 8000))
     
+    if not debug_mode:
+        logger.warning("Running the Flask development server; use 'gunicorn -c gunicorn.conf.py app:app' in production")
+    
     app.run(
         host='0.0.0.0',
         port=port,
@@ -183,83 +183,332 @@
 
 import pandas as pd
 import qrcode
+from PIL import Image
 import smtplib
+import ssl
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email.mime.image import MIMEImage
+from email.mime.nonmultipart import MIMENonMultipart
 import os
+import re
+import csv
+import argparse
+import queue
+import string
+import time
+import functools
+import base64
+import quopri
+import threading
+from email.generator import BytesGenerator
+from email.policy import compat32
 from io import BytesIO
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
+try:
+    import segno
+except ImportError:  # Optional: QR codes are rendered with qrcode + Pillow instead
+    segno = None
+
+SMTP_SERVER = 'smtp.gmail.com'
+SMTP_PORT = 587
+# Reconnect after this many messages; providers cap how much one session may send
+MAX_MESSAGES_PER_CONNECTION = 100
+# Probe the connection with NOOP every this many messages (0 disables the check)
+HEALTHCHECK_EVERY = 25
+# Parallel SMTP connections, one per worker thread
+SMTP_POOL_SIZE = 4
+# Sustained messages per second across all workers; keep within the provider's quota
+SEND_RATE_PER_SECOND = 10
+# Recipient CSV columns, in the order rows are unpacked, and rows read per chunk
+CSV_COLUMNS = ['Email Address', 'Name', 'Mobile', 'Verification Code', 'json_string']
+CSV_CHUNK_SIZE = 512
+# Columns of the failed-emails report
+FAILED_CSV_COLUMNS = CSV_COLUMNS + ['Error', 'Timestamp']
+# Gmail accepts at most this many RCPT TO addresses per message when grouping
+MAX_RECIPIENTS_PER_MESSAGE = 50
+# Constant Subject prefix and inline image Content-ID; only the name varies per recipient
+EMAIL_SUBJECT_PREFIX = "🏏 IPL Finals 2026 - Your Refreshment Coupon | "
+QR_CONTENT_ID = '<qr_code_image>'
+# Serialization policy for --fast-encoding: headers are written unfolded (long
+# encoded Subjects exceed RFC 2047's 75-character words, which most MTAs accept)
+FAST_ENCODING_POLICY = compat32.clone(max_line_length=None)
+# QR palette: index 0 is the white background, index 1 the #0047AB modules
+QR_PALETTE = [255, 255, 255, 0x00, 0x47, 0xAB]
+
+class ResumingSSLContext(ssl.SSLContext):
+    """
+    Client SSLContext that offers the last negotiated TLS session on new connections
+    
+    smtplib.SMTP.starttls() cannot pass a session itself, so wrap_socket fills
+    it in; reconnects to the same server can then resume TLS instead of
+    repeating the full handshake (the server falls back if it declines).
+    """
+    
+    last_session = None
+    
+    def wrap_socket(self, sock, *args, session=None, **kwargs):
+        return super().wrap_socket(sock, *args, session=session or self.last_session, **kwargs)
+
+def create_tls_context():
+    """
+    Create the certificate-verifying client context shared by all SMTP connections
+    
+    Returns:
+        ResumingSSLContext with the system CA certificates loaded
+    """
+    context = ResumingSSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    context.load_default_certs()
+    return context
+
+# One TLS context for every connection, so TLS sessions can be resumed across reconnects
+TLS_CONTEXT = create_tls_context()
+
+class SMTPSession:
+    """
+    Persistent, logged-in SMTP connection reused across many messages
+    
+    Probes the connection with NOOP every healthcheck_every sends, reconnects
+    when the server drops the connection and rotates the connection after
+    max_messages sends.
+    """
+    
+    def __init__(self, sender_email, sender_password, smtp_server=SMTP_SERVER, smtp_port=SMTP_PORT,
+                 max_messages=MAX_MESSAGES_PER_CONNECTION, healthcheck_every=HEALTHCHECK_EVERY):
+        self.sender_email = sender_email
+        self.sender_password = sender_password
+        self.smtp_server = smtp_server
+        self.smtp_port = smtp_port
+        self.max_messages = max_messages
+        self.healthcheck_every = healthcheck_every
+        self.server = None
+        self.sent_on_connection = 0
+    
+    def connect(self):
+        """Open the connection, upgrade it with STARTTLS and log in"""
+        server = smtplib.SMTP(self.smtp_server, self.smtp_port)
+        server.starttls(context=TLS_CONTEXT)
+        server.login(self.sender_email, self.sender_password)
+        # Read after a server reply, so TLS 1.3 session tickets have arrived
+        TLS_CONTEXT.last_session = server.sock.session
+        self.server = server
+        self.sent_on_connection = 0
+    
+    def close(self):
+        """Close the connection, ignoring errors from an already dropped server"""
+        if self.server is None:
+            return
+        try:
+            self.server.quit()
+        except (smtplib.SMTPException, OSError):
+            self.server.close()
+        self.server = None
+    
+    def is_healthy(self):
+        """Check with NOOP that the server still answers on this connection"""
+        try:
+            return self.server.noop()[0] == 250
+        except (smtplib.SMTPException, OSError):
+            return False
+    
+    def sendmail(self, from_addr, to_addrs, msg_bytes):
+        """
+        Send a serialized message over the shared connection, reconnecting if needed
+        
+        Returns:
+            Dict of refused recipients, as returned by smtplib.SMTP.sendmail
+        """
+        if self.server is None or self.sent_on_connection >= self.max_messages:
+            self.close()
+            self.connect()
+        elif (self.healthcheck_every and self.sent_on_connection
+              and self.sent_on_connection % self.healthcheck_every == 0 and not self.is_healthy()):
+            # Silently dropped idle connection; rebuild it before sending
+            self.close()
+            self.connect()
+        
+        try:
+            refused = self.server.sendmail(from_addr, to_addrs, msg_bytes)
+        except smtplib.SMTPServerDisconnected:
+            # Idle or rotated by the server; retry once on a fresh connection
+            self.close()
+            self.connect()
+            refused = self.server.sendmail(from_addr, to_addrs, msg_bytes)
+        
+        self.sent_on_connection += 1
+        return refused
+    
+    def __enter__(self):
+        self.connect()
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+class TokenBucket:
+    """
+    Thread-safe token bucket shared by the sending workers
+    
+    Allows a burst of up to capacity sends, then paces sends at rate per
+    second; callers only sleep when the bucket is empty.
+    """
+    
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """Block until a token is available, then consume it"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                
+                wait = (1 - self.tokens) / self.rate
+            
+            time.sleep(wait)
+
+# Per-thread QRCode objects reused by the qrcode + Pillow renderer
+_qr_builders = threading.local()
+
+def get_qr_builder():
+    """
+    Return this thread's QRCode, cleared and ready for new data
+    
+    Returns:
+        qrcode.QRCode configured for the coupon QR codes
+    """
+    qr = getattr(_qr_builders, 'qr', None)
+    if qr is None:
+        qr = qrcode.QRCode(
+            version=1,
+            error_correction=qrcode.constants.ERROR_CORRECT_H,
+            box_size=10,
+            border=4,
+        )
+        _qr_builders.qr = qr
+    
+    qr.clear()
+    # make(fit=True) grows the version in place; start the next fit from 1 again
+    qr.version = 1
+    return qr
+
+@functools.lru_cache(maxsize=4096)
 def generate_qr_code_bytes(json_string):
     """
     Generate QR code and return as bytes
     
+    Results are memoized, so a repeated payload (e.g. a resend) skips the
+    Reed-Solomon encoding and PNG rasterization.
+    
     Args:
         json_string: JSON string to encode
     
     Returns:
         QR code image as bytes
     """
-    qr = qrcode.QRCode(
-        version=1,
-        error_correction=qrcode.constants.ERROR_CORRECT_H,
-        box_size=10,
-        border=4,
-    )
+    if segno is not None:
+        # segno writes the PNG itself, skipping Pillow's image pipeline
+        buffered = BytesIO()
+        segno.make(json_string, error='h', micro=False).save(
+            buffered, kind='png', scale=10, border=4, dark='#0047AB', light='white'
+        )
+        return buffered.getvalue()
+    
+    qr = get_qr_builder()
     qr.add_data(json_string)
     qr.make(fit=True)
     
-    img = qr.make_image(fill_color="#0047AB", back_color="white")
+    # The QR is 1-bit data: pack the module matrix (border included) into a
+    # two-colour palette image, so the PNG is written at 1 bit per pixel
+    # instead of drawing and deflating a full RGB image
+    matrix = qr.get_matrix()
+    size = len(matrix)
+    img = Image.frombytes('P', (size, size), bytes(1 if cell else 0 for row in matrix for cell in row))
+    img.putpalette(QR_PALETTE)
+    img = img.resize((size * qr.box_size, size * qr.box_size), Image.NEAREST)
     
-    # Convert to bytes
+    # Convert to bytes; the image is tiny, so light compression is enough
     buffered = BytesIO()
-    img.save(buffered, format="PNG")
+    img.save(buffered, format="PNG", compress_level=1)
     return buffered.getvalue()
 
-def create_email_body(name, verification_code):
+def minify_css(css):
     """
-    Create professional HTML email body with cricket theme
+    Strip comments and collapse whitespace in a CSS block
     
     Args:
-        name: Recipient's name
-        verification_code: Verification code
+        css: CSS source
     
     Returns:
-        HTML email body with enhanced cricket theme
+        Minified CSS
     """
-    html = f"""
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{};,>])\s*', r'\1', css)
+    css = re.sub(r':\s+', ':', css)
+    return css.replace(';}', '}').strip()
+
+def minify_html(html):
+    """
+    Minify inline <style> blocks and drop line indentation from email HTML
+    
+    Lines are kept, so placeholder lines stay separate for encoding.
+    
+    Args:
+        html: HTML source
+    
+    Returns:
+        Minified HTML
+    """
+    html = re.sub(r'(<style>)(.*?)(</style>)',
+                  lambda match: match.group(1) + minify_css(match.group(2)) + match.group(3),
+                  html, flags=re.S)
+    return re.sub(r'\n[ \t]+', '\n', html).strip() + '\n'
+
+# Email HTML, minified and compiled once; only the name and verification code vary per recipient
+EMAIL_BODY_TEMPLATE = string.Template(minify_html("""
     <!DOCTYPE html>
     <html>
     <head>
         <meta charset="UTF-8">
         <meta name="viewport" content="width=device-width, initial-scale=1.0">
         <style>
-            * {{
+            * {
                 margin: 0;
                 padding: 0;
                 box-sizing: border-box;
-            }}
-            body {{
+            }
+            body {
                 font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
                 background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
                 padding: 20px;
-            }}
-            .email-wrapper {{
+            }
+            .email-wrapper {
                 max-width: 650px;
                 margin: 0 auto;
                 background: #ffffff;
                 border-radius: 20px;
                 overflow: hidden;
                 box-shadow: 0 20px 60px rgba(0, 0, 0, 0.3);
-            }}
-            .header {{
+            }
+            .header {
                 background: linear-gradient(135deg, #0047AB 0%, #002d72 100%);
                 padding: 0;
                 position: relative;
                 overflow: hidden;
-            }}
-            .header-pattern {{
+            }
+            .header-pattern {
                 position: absolute;
                 top: 0;
                 left: 0;
@@ -267,23 +516,18 @@ def create_email_body(name, verification_code):
                 bottom: 0;
                 background-image: 
                     repeating-linear-gradient(45deg, transparent, transparent 35px, rgba(255,255,255,.05) 35px, rgba(255,255,255,.05) 70px);
-            }}
-            .header-content {{
+            }
+            .header-content {
                 position: relative;
                 z-index: 1;
                 padding: 40px 30px;
                 text-align: center;
-            }}
-            .trophy-icon {{
+            }
+            .trophy-icon {
                 font-size: 60px;
                 margin-bottom: 15px;
-                animation: bounce 2s infinite;
-            }}
-            @keyframes bounce {{
-                0%, 100% {{ transform: translateY(0); }}
-                50% {{ transform: translateY(-10px); }}
-            }}
-            .header h1 {{
+            }
+            .header h1 {
                 color: #FFD700;
                 font-size: 32px;
                 font-weight: 800;
@@ -291,51 +535,51 @@ def create_email_body(name, verification_code):
                 letter-spacing: 2px;
                 margin-bottom: 10px;
                 text-shadow: 2px 2px 8px rgba(0, 0, 0, 0.5);
-            }}
-            .header-subtitle {{
+            }
+            .header-subtitle {
                 color: #ffffff;
                 font-size: 18px;
                 font-weight: 500;
                 letter-spacing: 1px;
-            }}
-            .content {{
+            }
+            .content {
                 padding: 50px 40px;
                 background: #ffffff;
-            }}
-            .greeting {{
+            }
+            .greeting {
                 font-size: 28px;
                 color: #0047AB;
                 margin-bottom: 25px;
                 font-weight: 700;
-            }}
-            .intro-text {{
+            }
+            .intro-text {
                 font-size: 17px;
                 line-height: 1.8;
                 color: #333;
                 margin-bottom: 30px;
                 text-align: center;
-            }}
-            .event-card {{
+            }
+            .event-card {
                 background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
                 color: white;
                 padding: 30px;
                 border-radius: 15px;
                 margin: 30px 0;
                 box-shadow: 0 10px 30px rgba(102, 126, 234, 0.3);
-            }}
-            .event-card h3 {{
+            }
+            .event-card h3 {
                 font-size: 22px;
                 margin-bottom: 20px;
                 text-align: center;
                 font-weight: 700;
                 letter-spacing: 1px;
-            }}
-            .event-info {{
+            }
+            .event-info {
                 display: flex;
                 flex-direction: column;
                 gap: 15px;
-            }}
-            .event-row {{
+            }
+            .event-row {
                 display: flex;
                 align-items: center;
                 gap: 15px;
@@ -343,56 +587,56 @@ def create_email_body(name, verification_code):
                 padding: 15px;
                 border-radius: 10px;
                 backdrop-filter: blur(10px);
-            }}
-            .event-icon {{
+            }
+            .event-icon {
                 font-size: 28px;
                 min-width: 40px;
-            }}
-            .event-text {{
+            }
+            .event-text {
                 flex: 1;
-            }}
-            .event-label {{
+            }
+            .event-label {
                 font-size: 13px;
                 opacity: 0.9;
                 margin-bottom: 5px;
-            }}
-            .event-value {{
+            }
+            .event-value {
                 font-size: 18px;
                 font-weight: 700;
-            }}
-            .verification-section {{
+            }
+            .verification-section {
                 background: linear-gradient(135deg, #FFD700 0%, #FFA500 100%);
                 padding: 30px;
                 border-radius: 15px;
                 text-align: center;
                 margin: 30px 0;
                 box-shadow: 0 10px 30px rgba(255, 215, 0, 0.3);
-            }}
-            .verification-label {{
+            }
+            .verification-label {
                 color: #0047AB;
                 font-size: 16px;
                 font-weight: 600;
                 margin-bottom: 15px;
                 text-transform: uppercase;
                 letter-spacing: 1px;
-            }}
-            .verification-code {{
+            }
+            .verification-code {
                 font-size: 42px;
                 font-weight: 900;
                 color: #0047AB;
                 letter-spacing: 8px;
                 text-shadow: 2px 2px 4px rgba(0, 0, 0, 0.1);
                 font-family: 'Courier New', monospace;
-            }}
-            .qr-section {{
+            }
+            .qr-section {
                 text-align: center;
                 margin: 40px 0;
                 padding: 40px;
                 background: linear-gradient(135deg, #f5f7fa 0%, #c3cfe2 100%);
                 border-radius: 20px;
                 position: relative;
-            }}
-            .qr-section::before {{
+            }
+            .qr-section::before {
                 content: '';
                 position: absolute;
                 top: -2px;
@@ -402,21 +646,21 @@ def create_email_body(name, verification_code):
                 background: linear-gradient(45deg, #0047AB, #FFD700, #0047AB);
                 border-radius: 20px;
                 z-index: -1;
-            }}
-            .qr-title {{
+            }
+            .qr-title {
                 font-size: 24px;
                 color: #0047AB;
                 font-weight: 700;
                 margin-bottom: 10px;
                 text-transform: uppercase;
                 letter-spacing: 2px;
-            }}
-            .qr-subtitle {{
+            }
+            .qr-subtitle {
                 color: #666;
                 margin-bottom: 25px;
                 font-size: 15px;
-            }}
-            .qr-code {{
+            }
+            .qr-code {
                 max-width: 300px;
                 height: auto;
                 border: 8px solid white;
@@ -424,49 +668,49 @@ def create_email_body(name, verification_code):
                 box-shadow: 0 10px 40px rgba(0, 0, 0, 0.2);
                 background: white;
                 padding: 15px;
-            }}
-            .qr-instruction {{
+            }
+            .qr-instruction {
                 margin-top: 20px;
                 font-size: 16px;
                 color: #0047AB;
                 font-weight: 600;
-            }}
-            .instructions-box {{
+            }
+            .instructions-box {
                 background: #f8f9fa;
                 border-left: 6px solid #0047AB;
                 padding: 30px;
                 margin: 30px 0;
                 border-radius: 10px;
-            }}
-            .instructions-box h3 {{
+            }
+            .instructions-box h3 {
                 color: #0047AB;
                 font-size: 20px;
                 margin-bottom: 20px;
                 display: flex;
                 align-items: center;
                 gap: 10px;
-            }}
-            .instructions-box ul {{
+            }
+            .instructions-box ul {
                 list-style: none;
                 padding: 0;
-            }}
-            .instructions-box li {{
+            }
+            .instructions-box li {
                 padding: 12px 0;
                 color: #555;
                 font-size: 15px;
                 line-height: 1.6;
                 position: relative;
                 padding-left: 30px;
-            }}
-            .instructions-box li::before {{
+            }
+            .instructions-box li::before {
                 content: '✓';
                 position: absolute;
                 left: 0;
                 color: #0047AB;
                 font-weight: bold;
                 font-size: 18px;
-            }}
-            .highlight-banner {{
+            }
+            .highlight-banner {
                 background: linear-gradient(135deg, #0047AB 0%, #002d72 100%);
                 color: white;
                 padding: 25px;
@@ -476,48 +720,48 @@ def create_email_body(name, verification_code):
                 font-size: 20px;
                 font-weight: 600;
                 letter-spacing: 1px;
-            }}
-            .footer {{
+            }
+            .footer {
                 background: linear-gradient(135deg, #0047AB 0%, #002d72 100%);
                 padding: 40px;
                 text-align: center;
                 color: white;
-            }}
-            .footer-icons {{
+            }
+            .footer-icons {
                 font-size: 30px;
                 margin-bottom: 20px;
-            }}
-            .footer-org {{
+            }
+            .footer-org {
                 font-size: 20px;
                 font-weight: 700;
                 color: #FFD700;
                 margin-bottom: 10px;
-            }}
-            .footer-text {{
+            }
+            .footer-text {
                 font-size: 14px;
                 opacity: 0.9;
                 line-height: 1.6;
-            }}
-            .divider {{
+            }
+            .divider {
                 height: 2px;
                 background: linear-gradient(to right, transparent, #0047AB, transparent);
                 margin: 30px 0;
-            }}
-            @media only screen and (max-width: 600px) {{
-                .content {{
+            }
+            @media only screen and (max-width: 600px) {
+                .content {
                     padding: 30px 20px;
-                }}
-                .header h1 {{
+                }
+                .header h1 {
                     font-size: 24px;
-                }}
-                .verification-code {{
+                }
+                .verification-code {
                     font-size: 32px;
                     letter-spacing: 4px;
-                }}
-                .qr-code {{
+                }
+                .qr-code {
                     max-width: 250px;
-                }}
-            }}
+                }
+            }
         </style>
     </head>
     <body>
@@ -534,7 +778,7 @@ def create_email_body(name, verification_code):
             
             <!-- Content -->
             <div class="content">
-                <div class="greeting">Hello {name}! 🎉</div>
+                <div class="greeting">Hello $name! 🎉</div>
                 
                 <p class="intro-text">
                     You're all set for the biggest cricket showdown of the year! Get ready to witness history in the making.
@@ -573,7 +817,7 @@ def create_email_body(name, verification_code):
                 <!-- Verification Code -->
                 <div class="verification-section">
                     <div class="verification-label">🎫 Your Verification Code</div>
-                    <div class="verification-code">{verification_code}</div>
+                    <div class="verification-code">$verification_code</div>
                 </div>
                 
                 <!-- QR Code Section -->
@@ -601,16 +845,125 @@ def create_email_body(name, verification_code):
         </div>
     </body>
     </html>
+    """))
+
+def create_email_body(name, verification_code):
+    """
+    Create professional HTML email body with cricket theme
+    
+    Args:
+        name: Recipient's name
+        verification_code: Verification code
+    
+    Returns:
+        HTML email body with enhanced cricket theme
     """
-    return html
+    return EMAIL_BODY_TEMPLATE.substitute(name=name, verification_code=verification_code)
+
+def build_qp_segments(template_text):
+    """
+    Split the email template into quoted-printable segments
+    
+    Runs of static lines are encoded once here; lines holding a placeholder
+    stay as string.Template objects and are encoded per recipient. Every
+    segment ends on a line boundary, so the encoded pieces concatenate into
+    valid quoted-printable.
+    
+    Args:
+        template_text: Template source with $name / $verification_code placeholders
+    
+    Returns:
+        List of encoded str segments and string.Template line segments
+    """
+    segments = []
+    static_lines = []
+    
+    for line in template_text.splitlines(keepends=True):
+        if '$' in line:
+            if static_lines:
+                segments.append(quopri.encodestring(''.join(static_lines).encode('utf-8')).decode('ascii'))
+                static_lines = []
+            segments.append(string.Template(line))
+        else:
+            static_lines.append(line)
+    
+    if static_lines:
+        segments.append(quopri.encodestring(''.join(static_lines).encode('utf-8')).decode('ascii'))
+    
+    return segments
+
+EMAIL_BODY_QP_SEGMENTS = build_qp_segments(EMAIL_BODY_TEMPLATE.template)
+
+def create_email_body_qp(name, verification_code):
+    """
+    Create the HTML email body already quoted-printable encoded
+    
+    Args:
+        name: Recipient's name
+        verification_code: Verification code
+    
+    Returns:
+        Quoted-printable encoded HTML body (decodes to create_email_body output)
+    """
+    return ''.join(
+        segment if isinstance(segment, str)
+        else quopri.encodestring(
+            segment.substitute(name=name, verification_code=verification_code).encode('utf-8')
+        ).decode('ascii')
+        for segment in EMAIL_BODY_QP_SEGMENTS
+    )
+
+# Per-thread MIME skeletons, reused across messages by the worker that owns them
+_message_skeletons = threading.local()
+
+def get_message_skeleton(sender_email):
+    """
+    Return this thread's reusable related/alternative/image MIME tree
+    
+    Args:
+        sender_email: Sender's email address, set once as the From header
+    
+    Returns:
+        Tuple of (msg, html_part, qr_image)
+    """
+    skeleton = getattr(_message_skeletons, 'skeleton', None)
+    if skeleton is not None and skeleton[0]['From'] == sender_email:
+        return skeleton
+    
+    # Create message with related content
+    msg = MIMEMultipart('related')
+    msg['From'] = sender_email
+    msg['To'] = ''
+    msg['Subject'] = ''
+    
+    # Create alternative part for HTML
+    msg_alternative = MIMEMultipart('alternative')
+    msg.attach(msg_alternative)
+    
+    # HTML part carrying a body that is already quoted-printable encoded
+    html_part = MIMENonMultipart('text', 'html', charset='utf-8')
+    html_part['Content-Transfer-Encoding'] = 'quoted-printable'
+    msg_alternative.attach(html_part)
+    
+    # QR code image with Content-ID; the payload is swapped in per recipient
+    qr_image = MIMEImage(b'', _subtype='png')
+    qr_image.add_header('Content-ID', QR_CONTENT_ID)
+    qr_image.add_header('Content-Disposition', 'inline', filename='QRCode.png')
+    msg.attach(qr_image)
+    
+    skeleton = (msg, html_part, qr_image)
+    _message_skeletons.skeleton = skeleton
+    return skeleton
 
 def send_email_with_qr(recipient_email, recipient_name, verification_code, json_string, 
-                       sender_email, sender_password, smtp_server='smtp.gmail.com', smtp_port=587):
+                       sender_email, sender_password, smtp_server=SMTP_SERVER, smtp_port=SMTP_PORT,
+                       session=None, fast_encoding=False):
     """
     Send email with embedded QR code using CID (Content-ID)
     
     Args:
-        recipient_email: Recipient's email address
+        recipient_email: Recipient's email address, or a list of addresses that
+            receive identical content in one message
         recipient_name: Recipient's name
         verification_code: Verification code
         json_string: JSON string for QR code
@@ -618,50 +971,128 @@ def send_email_with_qr(recipient_email, recipient_name, verification_code, json_
         sender_password: Sender's email password/app password
         smtp_server: SMTP server address
         smtp_port: SMTP port number
+        session: Optional SMTPSession to send over instead of opening a new connection
+        fast_encoding: Skip header folding when serializing (see FAST_ENCODING_POLICY)
     
     Returns:
-        Tuple: (success: bool, error_message: str or None)
+        Tuple: (success: bool, error_message: str or None, refused: dict). refused maps
+        each address the server rejected to its (code, message); when a message to
+        several recipients is only partly refused, the other addresses were delivered
     """
     try:
         # Generate QR code as bytes
         qr_bytes = generate_qr_code_bytes(json_string)
         
-        # Create message with related content
-        msg = MIMEMultipart('related')
-        msg['From'] = sender_email
-        msg['To'] = recipient_email
-        msg['Subject'] = f"🏏 IPL Finals 2026 - Your Refreshment Coupon | {recipient_name}"
+        # Fill in this thread's MIME skeleton instead of rebuilding the tree
+        msg, html_part, qr_image = get_message_skeleton(sender_email)
+        # Grouped recipients share one DATA upload without seeing each other's address
+        to_addrs = recipient_email if isinstance(recipient_email, list) else [recipient_email]
+        msg.replace_header('To', to_addrs[0] if len(to_addrs) == 1 else 'undisclosed-recipients:;')
+        msg.replace_header('Subject', f"{EMAIL_SUBJECT_PREFIX}{recipient_name}")
+        
+        # Create email body; only the personalized lines are encoded here
+        html_part.set_payload(create_email_body_qp(recipient_name, verification_code))
         
-        # Create alternative part for HTML
-        msg_alternative = MIMEMultipart('alternative')
-        msg.attach(msg_alternative)
+        # Swap in the QR code image (already base64 per the part's headers)
+        qr_image.set_payload(base64.encodebytes(qr_bytes).decode('ascii'))
+        qr_image.set_param('filename', f'QRCode_{recipient_name}.png', header='Content-Disposition')
         
-        # Create email body
-        html_body = create_email_body(recipient_name, verification_code)
-        msg_alternative.attach(MIMEText(html_body, 'html'))
+        # Serialize the same way smtplib.send_message does
+        buffered = BytesIO()
+        BytesGenerator(buffered, policy=FAST_ENCODING_POLICY if fast_encoding else None).flatten(
+            msg, linesep='\r\n'
+        )
+        msg_bytes = buffered.getvalue()
         
-        # Attach QR code image with Content-ID
-        qr_image = MIMEImage(qr_bytes)
-        qr_image.add_header('Content-ID', '<qr_code_image>')
-        qr_image.add_header('Content-Disposition', 'inline', filename=f'QRCode_{recipient_name}.png')
-        msg.attach(qr_image)
+        # Send over the shared connection, or open a one-off connection
+        if session is not None:
+            refused = session.sendmail(sender_email, to_addrs, msg_bytes)
+        else:
+            with SMTPSession(sender_email, sender_password, smtp_server, smtp_port) as one_off:
+                refused = one_off.sendmail(sender_email, to_addrs, msg_bytes)
         
-        # Connect to SMTP server and send email
-        server = smtplib.SMTP(smtp_server, smtp_port)
-        server.starttls()
-        server.login(sender_email, sender_password)
-        server.send_message(msg)
-        server.quit()
+        # sendmail only raises when every recipient is refused; the rest were accepted
+        if refused:
+            error_msg = str(smtplib.SMTPRecipientsRefused(refused))
+            print(f"✗ Refused for {recipient_name} ({', '.join(refused)}): {error_msg}")
+            return False, error_msg, refused
         
         print(f"✓ Email sent successfully to {recipient_name} ({recipient_email})")
-        return True, None
+        return True, None, {}
         
     except Exception as e:
         error_msg = str(e)
         print(f"✗ Failed to send email to {recipient_name} ({recipient_email}): {error_msg}")
-        return False, error_msg
+        # When every recipient is refused, report them all; otherwise nothing was delivered
+        return False, error_msg, getattr(e, 'recipients', None) or {}
 
-def process_and_send_emails(csv_file, sender_email, sender_password):
+def send_row(row, session_pool, rate_limiter, sender_email, sender_password, fast_encoding=False):
+    """
+    Send the email for one CSV row over a session borrowed from the pool
+    
+    Args:
+        row: Tuple of recipient values in CSV_COLUMNS order, with the
+            verification code already formatted as a string
+        session_pool: Queue of SMTPSession objects shared by the workers
+        rate_limiter: TokenBucket shared by the workers
+        sender_email: Sender's email address
+        sender_password: Sender's email password/app password
+        fast_encoding: Skip header folding when serializing
+    
+    Returns:
+        Tuple of (row, verification_code, success, error_message, refused), where
+        refused is the dict returned by send_email_with_qr
+    """
+    email, name, _, verification_code, json_string = row
+    
+    if pd.isna(verification_code):
+        error_msg = "Missing or invalid verification code"
+        print(f"✗ Failed to send email to {name} ({email}): {error_msg}")
+        return row, '', False, error_msg, {}
+    
+    # Wait for the shared rate limit instead of sleeping after every send
+    rate_limiter.acquire()
+    
+    session = session_pool.get()
+    try:
+        success, error_message, refused = send_email_with_qr(email, name, verification_code, json_string,
+                                                    sender_email, sender_password, session=session,
+                                                    fast_encoding=fast_encoding)
+    finally:
+        session_pool.put(session)
+    
+    return row, verification_code, success, error_message, refused
+
+def group_identical_rows(rows, max_recipients=MAX_RECIPIENTS_PER_MESSAGE):
+    """
+    Merge rows whose message content is identical into multi-recipient rows
+    
+    Rows are identical when name, verification code and QR payload all match,
+    so one DATA upload can go to every address in the group.
+    
+    Args:
+        rows: Iterable of recipient tuples in CSV_COLUMNS order
+        max_recipients: Largest number of addresses merged into one row
+    
+    Returns:
+        List of tuples in CSV_COLUMNS order whose email and mobile fields are lists
+    """
+    groups = {}
+    for email, name, mobile, verification_code, json_string in rows:
+        groups.setdefault((name, verification_code, json_string), []).append((email, mobile))
+    
+    grouped_rows = []
+    for (name, verification_code, json_string), members in groups.items():
+        for start in range(0, len(members), max_recipients):
+            batch = members[start:start + max_recipients]
+            grouped_rows.append(([email for email, _ in batch], name, [mobile for _, mobile in batch],
+                                 verification_code, json_string))
+    
+    return grouped_rows
+
+def process_and_send_emails(csv_file, sender_email, sender_password, pool_size=SMTP_POOL_SIZE,
+                            group_identical=False, send_rate=SEND_RATE_PER_SECOND, fast_encoding=False,
+                            max_per_conn=MAX_MESSAGES_PER_CONNECTION, healthcheck_every=HEALTHCHECK_EVERY):
     """
     Process CSV file and send emails to all recipients
     
@@ -669,67 +1100,125 @@ def process_and_send_emails(csv_file, sender_email, sender_password):
         csv_file: Path to CSV file with recipient data
         sender_email: Sender's email address
         sender_password: Sender's email password/app password
+        pool_size: Number of SMTP connections sending in parallel
+        group_identical: Send rows with identical content as one multi-recipient
+            message (rows are grouped within each CSV chunk)
+        send_rate: Messages per second allowed across all connections
+        fast_encoding: Skip RFC header folding when serializing messages
+        max_per_conn: Messages sent on one SMTP connection before it is rotated
+        healthcheck_every: Probe each connection with NOOP every this many messages
+            (0 disables the check)
     """
-    # Read CSV file
-    df = pd.read_csv(csv_file)
+    # Stream the CSV in chunks instead of loading the whole recipient list
+    reader = pd.read_csv(csv_file, chunksize=CSV_CHUNK_SIZE, usecols=lambda column: column in CSV_COLUMNS)
     
-    print(f"Processing {len(df)} recipients...")
+    print(f"Processing recipients from {csv_file}...")
     print("-" * 60)
     
     successful = 0
     failed = 0
-    failed_records = []
-    
-    # Iterate through each row and send email
-    for index, row in df.iterrows():
-        email = row['Email Address']
-        name = row['Name']
-        verification_code = str(int(row['Verification Code']))
-        json_string = row['json_string']
-        
-        # Send email
-        success, error_message = send_email_with_qr(email, name, verification_code, json_string, 
-                                                    sender_email, sender_password)
-        
-        if success:
-            successful += 1
-        else:
-            failed += 1
-            # Store failed record
-            failed_records.append({
-                'Email Address': email,
-                'Name': name,
-                'Mobile': row.get('Mobile', 'N/A'),
-                'Verification Code': verification_code,
-                'json_string': json_string,
-                'Error': error_message,
-                'Timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            })
-        
-        # Add delay to avoid rate limiting
-        import time
-        time.sleep(1)
+    
+    # Failed rows are appended to the report as they happen (opened on the first failure)
+    failed_csv_filename = f"failed_emails_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    failed_file = None
+    failed_writer = None
+    
+    # Each worker borrows one persistent connection; sessions connect on first use
+    session_pool = queue.Queue()
+    for _ in range(pool_size):
+        session_pool.put(SMTPSession(sender_email, sender_password, max_messages=max_per_conn,
+                                     healthcheck_every=healthcheck_every))
+    rate_limiter = TokenBucket(send_rate)
+    
+    try:
+        with ThreadPoolExecutor(max_workers=pool_size) as executor:
+            for chunk in reader:
+                if 'Mobile' not in chunk:
+                    chunk['Mobile'] = 'N/A'
+                
+                # Format the verification codes for the whole chunk in one vectorized pass
+                codes = pd.to_numeric(chunk['Verification Code'], errors='coerce')
+                codes = codes.where(codes == codes.round())
+                chunk['Verification Code'] = codes.astype('Int64').astype('string')
+                
+                # Zip the raw column arrays instead of building a Series (or namedtuple) per row
+                rows = zip(*(chunk[column].to_numpy() for column in CSV_COLUMNS))
+                if group_identical:
+                    rows = group_identical_rows(rows)
+                
+                futures = [executor.submit(send_row, row, session_pool, rate_limiter, sender_email,
+                                           sender_password, fast_encoding)
+                           for row in rows]
+                
+                for future in as_completed(futures):
+                    row, verification_code, success, error_message, refused = future.result()
+                    email, name, mobile, _, json_string = row
+                    recipients = list(zip(email, mobile)) if isinstance(email, list) else [(email, mobile)]
+                    
+                    # A partly refused group was delivered to everyone else; report only the
+                    # refused addresses so a resend from the report doesn't send duplicates
+                    if refused:
+                        refused_recipients = [(email, mobile) for email, mobile in recipients if email in refused]
+                        successful += len(recipients) - len(refused_recipients)
+                        recipients = refused_recipients
+                    if success:
+                        successful += len(recipients)
+                    else:
+                        failed += len(recipients)
+                        
+                        if failed_writer is None:
+                            failed_file = open(failed_csv_filename, 'w', newline='', encoding='utf-8')
+                            failed_writer = csv.DictWriter(failed_file, fieldnames=FAILED_CSV_COLUMNS)
+                            failed_writer.writeheader()
+                        
+                        # Store failed records
+                        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                        for email, mobile in recipients:
+                            record = {
+                                'Email Address': email,
+                                'Name': name,
+                                'Mobile': mobile,
+                                'Verification Code': verification_code,
+                                'json_string': json_string,
+                                'Error': error_message,
+                                'Timestamp': timestamp
+                            }
+                            failed_writer.writerow({key: '' if pd.isna(value) else value
+                                                    for key, value in record.items()})
+                        failed_file.flush()
+    finally:
+        while not session_pool.empty():
+            session_pool.get_nowait().close()
+        if failed_file is not None:
+            failed_file.close()
     
     print("-" * 60)
     print(f"\n📊 Email Sending Summary")
     print("=" * 60)
     print(f"✓ Successful: {successful}")
     print(f"✗ Failed: {failed}")
-    print(f"📧 Total: {len(df)}")
+    print(f"📧 Total: {successful + failed}")
     print("=" * 60)
     
-    # Save failed records to CSV if any
-    if failed_records:
-        failed_df = pd.DataFrame(failed_records)
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        failed_csv_filename = f"failed_emails_{timestamp}.csv"
-        failed_df.to_csv(failed_csv_filename, index=False)
+    # Report where the failed records were saved, if any
+    if failed:
         print(f"\n⚠️  Failed records saved to: {failed_csv_filename}")
-        print(f"    Total failed records: {len(failed_records)}")
+        print(f"    Total failed records: {failed}")
     else:
         print(f"\n🎉 All emails sent successfully!")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Send IPL Finals coupon emails")
+    parser.add_argument('--group-identical', action='store_true',
+                        help="send rows with identical content as one multi-recipient message")
+    parser.add_argument('--fast-encoding', action='store_true',
+                        help="skip RFC header folding; use only if your SMTP provider accepts it")
+    parser.add_argument('--max-per-conn', type=int, default=MAX_MESSAGES_PER_CONNECTION,
+                        help="messages sent on one SMTP connection before reconnecting")
+    parser.add_argument('--healthcheck-every', type=int, default=HEALTHCHECK_EVERY,
+                        help="probe each SMTP connection with NOOP every N messages (0 disables)")
+    args = parser.parse_args()
+    
     # Configuration
     CSV_FILE = "merged_csv.csv"
     SENDER_EMAIL = "cricket.activity@iiserkol.ac.in"
@@ -741,4 +1230,6 @@ if __name__ == "__main__":
     print()
     
     # Process and send emails
-    process_and_send_emails(CSV_FILE, SENDER_EMAIL, SENDER_PASSWORD)
\ No newline at end of file
+    process_and_send_emails(CSV_FILE, SENDER_EMAIL, SENDER_PASSWORD, group_identical=args.group_identical,
+                            fast_encoding=args.fast_encoding, max_per_conn=args.max_per_conn,
+                            healthcheck_every=args.healthcheck_every)
\ No newline at end of file
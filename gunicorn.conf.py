@@ -0,0 +1,22 @@
+"""
+Gunicorn configuration for production deployments
+Run with: gunicorn -c gunicorn.conf.py app:app
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+
+# Campaign progress, cached Gmail services and the log listener live in process memory,
+# so one worker process serves every request and its threads provide the concurrency
+workers = int(os.environ.get('WEB_WORKERS', '1'))
+worker_class = 'gthread'
+threads = int(os.environ.get('WEB_THREADS', '16'))
+
+# Import the app inside each worker so its background threads start after the fork
+preload_app = False
+
+# OAuth callbacks and Gmail calls can be slow; don't kill workers mid-request
+timeout = 120
+graceful_timeout = 30
+keepalive = 5
@@ -6,7 +6,11 @@ Handles Google OAuth login and Gmail API integration
 import os
 import json
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
 from typing import Dict, Optional, Any
+import requests
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import Flow
@@ -29,6 +33,43 @@ import time
 
 logger = logging.getLogger(__name__)
 
+# Refresh access tokens only when they are expired or this close to expiring
+TOKEN_REFRESH_LEEWAY = timedelta(seconds=60)
+
+# One lock per refresh token so concurrent senders don't refresh the same grant twice
+_refresh_locks: Dict[str, threading.Lock] = {}
+_refresh_locks_guard = threading.Lock()
+
+# Pooled keep-alive HTTP session for OAuth token exchange and user info lookups
+_http_session = requests.Session()
+
+
+def _token_needs_refresh(credentials: Credentials) -> bool:
+    """Check whether credentials are missing a token or about to expire"""
+    if not credentials.token:
+        return True
+    if credentials.expiry is None:
+        return False
+    # google-auth stores expiry as a naive UTC datetime
+    return credentials.expiry - datetime.utcnow() < TOKEN_REFRESH_LEEWAY
+
+
+def refresh_if_expiring(credentials: Credentials) -> bool:
+    """Refresh credentials only when needed. Returns True if a refresh happened"""
+    if not _token_needs_refresh(credentials):
+        return False
+    
+    with _refresh_locks_guard:
+        lock = _refresh_locks.setdefault(credentials.refresh_token or '', threading.Lock())
+    
+    with lock:
+        # Another thread may have refreshed while we waited
+        if not _token_needs_refresh(credentials):
+            return False
+        credentials.refresh(Request())
+        logger.info("Refreshed Google OAuth access token")
+        return True
+
 class GoogleAuthService:
     """Handles Google OAuth authentication and Gmail API operations"""
     
@@ -89,7 +130,6 @@ class GoogleAuthService:
         
         try:
             # Manual token exchange to avoid scope validation issues
-            import requests
             
             # Use provided redirect_uri or fall back to default
             current_redirect_uri = redirect_uri or self.redirect_uri
@@ -103,10 +143,14 @@ class GoogleAuthService:
             }
             
             # Exchange authorization code for tokens
-            response = requests.post('https://oauth2.googleapis.com/token', data=token_data)
+            response = _http_session.post('https://oauth2.googleapis.com/token', data=token_data, timeout=30)
             response.raise_for_status()
             token_response = response.json()
             
+            expiry = None
+            if token_response.get('expires_in'):
+                expiry = datetime.utcnow() + timedelta(seconds=int(token_response['expires_in']))
+            
             # Create credentials object
             credentials = Credentials(
                 token=token_response.get('access_token'),
@@ -114,7 +158,8 @@ class GoogleAuthService:
                 token_uri='https://oauth2.googleapis.com/token',
                 client_id=self.client_id,
                 client_secret=self.client_secret,
-                scopes=self.scopes  # Use our original scopes, ignore the extra ones from Google
+                scopes=self.scopes,  # Use our original scopes, ignore the extra ones from Google
+                expiry=expiry
             )
             
             # Get user info
@@ -127,6 +172,7 @@ class GoogleAuthService:
                 'client_id': credentials.client_id,
                 'client_secret': credentials.client_secret,
                 'scopes': self.scopes,  # Use our original scopes
+                'expiry': expiry.isoformat() if expiry else None,
                 'user_info': user_info
             }
             
@@ -137,15 +183,20 @@ class GoogleAuthService:
     def get_user_info(self, credentials: Credentials) -> Dict[str, Any]:
         """Get user information from Google API"""
         try:
-            service = build('oauth2', 'v2', credentials=credentials)
-            user_info = service.userinfo().get().execute()
+            response = _http_session.get(
+                'https://www.googleapis.com/oauth2/v2/userinfo',
+                headers={'Authorization': f'Bearer {credentials.token}'},
+                timeout=30
+            )
+            response.raise_for_status()
+            user_info = response.json()
             return {
                 'email': user_info.get('email'),
                 'name': user_info.get('name'),
                 'picture': user_info.get('picture'),
                 'id': user_info.get('id')
             }
-        except HttpError as e:
+        except requests.RequestException as e:
             logger.error(f"Error getting user info: {e}")
             return {}
     
@@ -170,13 +221,15 @@ class GoogleAuthService:
     def create_credentials_from_session(self, session_data: Dict[str, Any]) -> Optional[Credentials]:
         """Create credentials object from session data"""
         try:
+            expiry = session_data.get('expiry')
             return Credentials(
                 token=session_data.get('access_token'),
                 refresh_token=session_data.get('refresh_token'),
                 token_uri=session_data.get('token_uri'),
                 client_id=session_data.get('client_id'),
                 client_secret=session_data.get('client_secret'),
-                scopes=session_data.get('scopes')
+                scopes=session_data.get('scopes'),
+                expiry=datetime.fromisoformat(expiry) if expiry else None
             )
         except Exception as e:
             logger.error(f"Error creating credentials: {e}")
@@ -186,9 +239,28 @@ class GoogleAuthService:
 class GmailEmailService:
     """Email service using Gmail API for authenticated users"""
     
+    # Gmail recommends at most 50 requests per batch to avoid rate limiting
+    BATCH_SIZE = 50
+    # Hard limit on calls in one Gmail batch HTTP request
+    MAX_BATCH_SIZE = 100
+    # Pause between batch requests to stay under per-user sending limits
+    BATCH_DELAY_SECONDS = 0.1
+    # Batch requests in flight at once; Gmail's per-user quota caps how far this can go
+    MAX_CONCURRENT_BATCHES = 4
+    
     def __init__(self, credentials: Credentials):
         self.credentials = credentials
         self.logger = logging.getLogger(__name__)
+        # httplib2 transports are not thread-safe, so keep one built client per thread
+        self._local = threading.local()
+    
+    def _get_service(self):
+        """Get the Gmail API client for this thread, building it on first use"""
+        service = getattr(self._local, 'service', None)
+        if service is None:
+            service = build('gmail', 'v1', credentials=self.credentials, cache_discovery=False)
+            self._local.service = service
+        return service
         
     def _create_message(self, sender: str, to: str, subject: str, html_content: str) -> Dict[str, str]:
         """Create a message for Gmail API"""
@@ -208,12 +280,11 @@ class GmailEmailService:
     def send_email(self, sender_email: str, recipient: str, subject: str, html_content: str) -> EmailResult:
         """Send a single email using Gmail API"""
         try:
-            # Refresh credentials if needed
-            if self.credentials.expired:
-                self.credentials.refresh(Request())
+            # Refresh credentials only if expired or about to expire
+            refresh_if_expiring(self.credentials)
             
-            # Build Gmail service
-            service = build('gmail', 'v1', credentials=self.credentials)
+            # Reuse the Gmail client and its keep-alive HTTP connection
+            service = self._get_service()
             
             # Create message
             message = self._create_message(sender_email, recipient, subject, html_content)
@@ -247,8 +318,75 @@ class GmailEmailService:
                 timestamp=time.strftime('%Y-%m-%d %H:%M:%S')
             )
     
-    def send_batch_emails(self, sender_email: str, recipients: list, template_renderer, progress_callback=None) -> Dict:
-        """Send emails to multiple recipients using Gmail API"""
+    def _send_batch(self, sender_email: str, recipients: list, template_renderer) -> list:
+        """Send a chunk of recipients in a single Gmail API batch request"""
+        results = [None] * len(recipients)
+        service = self._get_service()
+        
+        def handle_response(request_id, response, exception):
+            index = int(request_id)
+            recipient_email = recipients[index]['email']
+            if exception is None:
+                self.logger.debug(f"Email sent successfully to {recipient_email} via Gmail API")
+                results[index] = EmailResult(
+                    success=True,
+                    recipient=recipient_email,
+                    timestamp=time.strftime('%Y-%m-%d %H:%M:%S')
+                )
+            else:
+                error_msg = f"Gmail API error: {exception}"
+                self.logger.error(f"Failed to send email to {recipient_email}: {error_msg}")
+                results[index] = EmailResult(
+                    success=False,
+                    recipient=recipient_email,
+                    error_message=error_msg,
+                    timestamp=time.strftime('%Y-%m-%d %H:%M:%S')
+                )
+        
+        batch = service.new_batch_http_request(callback=handle_response)
+        for index, recipient_data in enumerate(recipients):
+            recipient_email = recipient_data['email']
+            
+            # Render email content
+            try:
+                html_content = template_renderer('event.html', recipient_data)
+                subject = recipient_data.get('subject', 'Your Digital Coupon')
+                message = self._create_message(sender_email, recipient_email, subject, html_content)
+                batch.add(service.users().messages().send(userId='me', body=message), request_id=str(index))
+            except Exception as e:
+                results[index] = EmailResult(
+                    success=False,
+                    recipient=recipient_email,
+                    error_message=str(e),
+                    timestamp=time.strftime('%Y-%m-%d %H:%M:%S')
+                )
+                self.logger.error(f"Error processing email for {recipient_email}: {e}")
+        
+        if any(result is None for result in results):
+            try:
+                # Refresh credentials only if expired or about to expire
+                refresh_if_expiring(self.credentials)
+                batch.execute()
+            except Exception as e:
+                error_msg = f"Unexpected error: {str(e)}"
+                self.logger.error(f"Gmail batch request failed: {error_msg}")
+                for index, result in enumerate(results):
+                    if result is None:
+                        results[index] = EmailResult(
+                            success=False,
+                            recipient=recipients[index]['email'],
+                            error_message=error_msg,
+                            timestamp=time.strftime('%Y-%m-%d %H:%M:%S')
+                        )
+        
+        return results
+    
+    def send_batch_emails(self, sender_email: str, recipients: list, template_renderer, progress_callback=None,
+                          batch_size: Optional[int] = None, max_workers: Optional[int] = None) -> Dict:
+        """Send emails to multiple recipients using Gmail API batch requests"""
+        batch_size = min(max(1, batch_size or self.BATCH_SIZE), self.MAX_BATCH_SIZE)
+        max_workers = max(1, max_workers or self.MAX_CONCURRENT_BATCHES)
+        
         results = {
             'total': len(recipients),
             'sent': 0,
@@ -259,50 +397,52 @@ class GmailEmailService:
         
         self.logger.info(f"Starting Gmail batch email send to {len(recipients)} recipients")
         
+        valid_recipients = []
         for i, recipient_data in enumerate(recipients):
-            recipient_email = recipient_data.get('email')
-            if not recipient_email:
+            if not recipient_data.get('email'):
                 self.logger.warning(f"Skipping recipient {i}: no email address")
                 continue
+            valid_recipients.append(recipient_data)
+        
+        chunks = [valid_recipients[start:start + batch_size]
+                  for start in range(0, len(valid_recipients), batch_size)]
+        chunk_results = [None] * len(chunks)
+        processed = 0
+        
+        def send_chunk(chunk):
+            chunk_result = self._send_batch(sender_email, chunk, template_renderer)
+            # Small delay before this worker's next batch to avoid rate limiting
+            time.sleep(self.BATCH_DELAY_SECONDS)
+            return chunk_result
+        
+        # Overlap the network round trips of several batch requests
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(send_chunk, chunk): index for index, chunk in enumerate(chunks)}
             
-            # Render email content
-            try:
-                html_content = template_renderer('event.html', recipient_data)
-                subject = recipient_data.get('subject', 'Your Digital Coupon')
-                
-                # Send individual email
-                result = self.send_email(sender_email, recipient_email, subject, html_content)
+            for future in as_completed(futures):
+                index = futures[future]
+                chunk_results[index] = future.result()
+                processed += len(chunks[index])
                 
-                results['results'].append(result)
+                for result in chunk_results[index]:
+                    if result.success:
+                        results['sent'] += 1
+                    else:
+                        results['failed'] += 1
                 
-                if result.success:
-                    results['sent'] += 1
-                else:
-                    results['failed'] += 1
-                
-                # Call progress callback if provided
+                # Call progress callback once per batch if provided
                 if progress_callback:
                     progress_callback({
-                        'current': i + 1,
+                        'current': processed,
                         'total': len(recipients),
                         'sent': results['sent'],
                         'failed': results['failed'],
-                        'last_result': result
+                        'last_result': chunk_results[index][-1]
                     })
-                
-                # Small delay between emails to avoid rate limiting
-                time.sleep(0.1)
-                
-            except Exception as e:
-                error_result = EmailResult(
-                    success=False,
-                    recipient=recipient_email,
-                    error_message=str(e),
-                    timestamp=time.strftime('%Y-%m-%d %H:%M:%S')
-                )
-                results['results'].append(error_result)
-                results['failed'] += 1
-                self.logger.error(f"Error processing email for {recipient_email}: {e}")
+        
+        # Keep results in recipient order regardless of which batch finished first
+        for chunk_result in chunk_results:
+            results['results'].extend(chunk_result)
         
         results['end_time'] = time.strftime('%Y-%m-%d %H:%M:%S')
         self.logger.info(f"Gmail batch email send completed: {results['sent']} sent, {results['failed']} failed")
@@ -312,11 +452,10 @@ class GmailEmailService:
     def test_connection(self) -> bool:
         """Test Gmail API connection by building the service"""
         try:
-            if self.credentials.expired:
-                self.credentials.refresh(Request())
+            refresh_if_expiring(self.credentials)
             
             # Just build the service - don't try to read profile as we don't have permission
-            service = build('gmail', 'v1', credentials=self.credentials)
+            service = self._get_service()
             
             self.logger.info("Gmail API connection test successful - service built successfully")
             return True
@@ -1,9 +1,17 @@
+import os
 import uuid
+import atexit
+import threading
+import multiprocessing
 import qrcode
 import base64
 import random
 import string
-from io import BytesIO
+import struct
+import zlib
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timezone
 from typing import Dict, Any, Optional, List
 import logging
@@ -12,12 +20,91 @@ import json
 from src.data import CSVManager, CouponRecord
 
 
+# Forking a threaded web worker copies locks held by other threads into the children;
+# start pool workers from a clean process instead
+_QR_POOL_START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+# One QRCode per thread (and per pool worker process), cleared between renders
+_qr_builders = threading.local()
+
+
+def _get_qr_builder() -> qrcode.QRCode:
+    """Return this thread's QRCode, cleared and ready for new data"""
+    qr = getattr(_qr_builders, 'qr', None)
+    if qr is None:
+        qr = qrcode.QRCode(
+            version=1,
+            error_correction=qrcode.constants.ERROR_CORRECT_L,
+            box_size=10,
+            border=4,
+        )
+        _qr_builders.qr = qr
+    
+    qr.clear()
+    # make(fit=True) grows the version in place; start the next fit from 1 again
+    qr.version = 1
+    return qr
+
+
+def _qr_payload(verification_code: str, email: str) -> str:
+    """Build the QR JSON payload, byte-identical to json.dumps({'v': ..., 'e': ...})"""
+    # Digit codes and plain printable ASCII emails need no JSON escaping
+    if email.isascii() and email.isprintable() and '"' not in email and '\\' not in email:
+        return f'{{"v": "{verification_code}", "e": "{email}"}}'
+    return json.dumps({'v': verification_code, 'e': email})
+
+
+# Fixed PNG framing shared by every QR image
+_PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+_PNG_IEND = struct.pack('>I', 0) + b'IEND' + struct.pack('>I', zlib.crc32(b'IEND'))
+
+
+def _png_chunk(chunk_type: bytes, payload: bytes) -> bytes:
+    """Frame a PNG chunk with its length and CRC"""
+    return (struct.pack('>I', len(payload)) + chunk_type + payload +
+            struct.pack('>I', zlib.crc32(payload, zlib.crc32(chunk_type))))
+
+
+def _encode_qr_png(matrix: List[List[bool]], box_size: int) -> bytes:
+    """Encode a QR module matrix (border included) as a 1-bit grayscale PNG, dark modules black"""
+    # White is 1 in 1-bit grayscale, so light modules set the bit
+    modules = ~np.array(matrix, dtype=bool)
+    scanline = np.repeat(modules, box_size, axis=1)
+    size = scanline.shape[1]
+    
+    # Pack each pixel row to bytes, prefix filter type 0 (None), then repeat it per box row
+    rows = np.packbits(scanline, axis=1)
+    rows = np.hstack([np.zeros((rows.shape[0], 1), dtype=np.uint8), rows])
+    raw = np.repeat(rows, box_size, axis=0).tobytes()
+    
+    header = struct.pack('>IIBBBBB', size, size, 1, 0, 0, 0, 0)
+    return (_PNG_SIGNATURE + _png_chunk(b'IHDR', header) +
+            _png_chunk(b'IDAT', zlib.compress(raw, 6)) + _PNG_IEND)
+
+
+def _render_qr_png_base64(data: str) -> str:
+    """Render data as a QR code PNG and return it base64 encoded (runs in worker processes)"""
+    qr = _get_qr_builder()
+    qr.add_data(data)
+    qr.make(fit=True)
+    
+    # Encode the module matrix straight to PNG instead of going through a Pillow image
+    png = _encode_qr_png(qr.get_matrix(), qr.box_size)
+    return base64.b64encode(png).decode()
+
+
 class CouponManager:
     """Manages coupon generation and validation without encryption"""
     
+    # Below this many QR codes the process pool round trip costs more than it saves
+    QR_PARALLEL_THRESHOLD = 64
+    QR_CHUNK_SIZE = 64
+    
     def __init__(self, csv_manager: Optional[CSVManager] = None):
         self.csv_manager = csv_manager or CSVManager()
         self.logger = logging.getLogger(__name__)
+        self._qr_pool: Optional[ProcessPoolExecutor] = None
+        self._qr_pool_lock = threading.Lock()
     
     def generate_coupon_id(self) -> str:
         """Generate unique coupon ID using UUID4"""
@@ -27,6 +114,17 @@ class CouponManager:
         """Generate 6-digit verification code"""
         return ''.join(random.choices(string.digits, k=6))
     
+    def generate_coupon_ids(self, count: int) -> List[str]:
+        """Generate multiple UUID4 coupon IDs from a single urandom call"""
+        random_bytes = os.urandom(16 * count)
+        return [str(uuid.UUID(bytes=random_bytes[i:i + 16], version=4))
+                for i in range(0, 16 * count, 16)]
+    
+    def generate_verification_codes(self, count: int) -> List[str]:
+        """Generate multiple 6-digit verification codes in one draw"""
+        digits = ''.join(random.choices(string.digits, k=6 * count))
+        return [digits[i:i + 6] for i in range(0, 6 * count, 6)]
+    
     def create_qr_code(self, data: str) -> str:
         """
         Generate QR code from data and return as base64 string
@@ -38,30 +136,49 @@ class CouponManager:
             Base64 encoded PNG image of QR code
         """
         try:
-            # Create QR code
-            qr = qrcode.QRCode(
-                version=1,
-                error_correction=qrcode.constants.ERROR_CORRECT_L,
-                box_size=10,
-                border=4,
-            )
-            qr.add_data(data)
-            qr.make(fit=True)
-            
-            # Create image
-            img = qr.make_image(fill_color="black", back_color="white")
-            
-            # Convert to base64
-            buffer = BytesIO()
-            img.save(buffer, format='PNG')
-            img_str = base64.b64encode(buffer.getvalue()).decode()
-            
-            return img_str
+            return _render_qr_png_base64(data)
             
         except Exception as e:
             self.logger.error(f"Error creating QR code: {str(e)}")
             raise
     
+    def _get_qr_pool(self) -> ProcessPoolExecutor:
+        """Get the QR rendering process pool, starting it on first use"""
+        with self._qr_pool_lock:
+            if self._qr_pool is None:
+                self._qr_pool = ProcessPoolExecutor(
+                    mp_context=multiprocessing.get_context(_QR_POOL_START_METHOD))
+                atexit.register(self._qr_pool.shutdown)
+            return self._qr_pool
+    
+    def _discard_qr_pool(self, pool: ProcessPoolExecutor):
+        """Drop a broken pool so the next batch starts a fresh one"""
+        with self._qr_pool_lock:
+            if self._qr_pool is pool:
+                self._qr_pool = None
+        atexit.unregister(pool.shutdown)
+        pool.shutdown(wait=False, cancel_futures=True)
+    
+    def create_qr_codes(self, payloads: List[str]) -> List[str]:
+        """
+        Generate QR codes for many payloads, fanning out across CPU cores for large batches
+        
+        Args:
+            payloads: String data to encode, one QR code per entry
+            
+        Returns:
+            Base64 encoded PNG images in the same order as payloads
+        """
+        if len(payloads) < self.QR_PARALLEL_THRESHOLD or (os.cpu_count() or 1) < 2:
+            return [_render_qr_png_base64(payload) for payload in payloads]
+        
+        pool = self._get_qr_pool()
+        try:
+            return list(pool.map(_render_qr_png_base64, payloads, chunksize=self.QR_CHUNK_SIZE))
+        except BrokenProcessPool:
+            self._discard_qr_pool(pool)
+            raise
+    
     def generate_coupon(self, email: str, event_name: str = "Special Event") -> Dict[str, Any]:
         """
         Generate a complete coupon with QR code and 6-digit verification code
@@ -88,12 +205,8 @@ class CouponManager:
                 'valid': True
             }
             
-            # Create QR code with verification code and email for fast scanning
-            qr_data = {
-                'v': verification_code,  # Short key for verification code
-                'e': email.lower()       # Short key for email
-            }
-            qr_code_base64 = self.create_qr_code(json.dumps(qr_data))
+            # Create QR code with verification code and email, using short keys for fast scanning
+            qr_code_base64 = self.create_qr_code(_qr_payload(verification_code, email.lower()))
             
             # Create coupon record
             coupon_record = CouponRecord(
@@ -107,7 +220,7 @@ class CouponManager:
             
             # Save to CSV
             if self.csv_manager.save_coupon(coupon_record):
-                self.logger.info(f"Generated coupon {coupon_id} for {email} with verification code {verification_code}")
+                self.logger.debug(f"Generated coupon {coupon_id} for {email} with verification code {verification_code}")
                 
                 return {
                     'coupon_id': coupon_id,
@@ -150,40 +263,40 @@ class CouponManager:
         
         coupon_records = []
         
+        valid_recipients = []
         for recipient in recipients:
             email = recipient.get('email', '').strip()
             if not email:
                 results['failed'] += 1
                 results['errors'].append("Empty email address")
                 continue
-            
+            valid_recipients.append((recipient, email, recipient.get('email_lc') or email.lower()))
+        
+        # Generate unique identifiers for the whole batch up front
+        coupon_ids = self.generate_coupon_ids(len(valid_recipients))
+        verification_codes = self.generate_verification_codes(len(valid_recipients))
+        
+        # QR code with verification code and email, using short keys for fast scanning
+        qr_payloads = [_qr_payload(verification_code, email_lc)
+                       for (_, _, email_lc), verification_code in zip(valid_recipients, verification_codes)]
+        try:
+            qr_codes = self.create_qr_codes(qr_payloads)
+        except Exception as e:
+            # Fall back to rendering each QR code inline so failures stay per recipient
+            self.logger.error(f"Error rendering QR codes in parallel: {str(e)}")
+            qr_codes = [None] * len(qr_payloads)
+        
+        for (recipient, email, email_lc), coupon_id, verification_code, qr_payload, qr_code_base64 in zip(
+                valid_recipients, coupon_ids, verification_codes, qr_payloads, qr_codes):
             try:
-                # Generate unique identifiers
-                coupon_id = self.generate_coupon_id()
-                verification_code = self.generate_verification_code()
-                
-                coupon_data = {
-                    'coupon_id': coupon_id,
-                    'email': email.lower(),
-                    'event_name': event_name,
-                    'verification_code': verification_code,
-                    'created_at': datetime.now(timezone.utc).isoformat(),
-                    'valid': True
-                }
-                
-                # Create QR code with verification code and email
-                qr_data = {
-                    'v': verification_code,  # Short key for verification code
-                    'e': email.lower()       # Short key for email
-                }
-                qr_code_base64 = self.create_qr_code(json.dumps(qr_data))
+                if qr_code_base64 is None:
+                    qr_code_base64 = self.create_qr_code(qr_payload)
                 
                 # Create record
                 coupon_record = CouponRecord(
+                    name=recipient.get('name', ''),
+                    email=email_lc,
                     coupon_id=coupon_id,
-                    email=email.lower(),
-                    encrypted_data=None,
-                    qr_code_data=qr_code_base64,
                     verification_code=verification_code,
                     status='generated'
                 )
@@ -340,25 +453,32 @@ class CouponManager:
         Returns:
             True if successfully marked as sent, False otherwise
         """
+        success = self.mark_coupons_sent([coupon_id]) == 1
+        if not success:
+            self.logger.error(f"Coupon {coupon_id} not found for marking as sent")
+        return success
+    
+    def mark_coupons_sent(self, coupon_ids: List[str]) -> int:
+        """
+        Mark multiple coupons as sent with a single coupons file rewrite
+        
+        Args:
+            coupon_ids: IDs of the coupons to mark as sent
+            
+        Returns:
+            Number of coupons marked as sent
+        """
         try:
             sent_at = datetime.now(timezone.utc).isoformat()
-            # Update the coupon record with sent timestamp
-            coupon_record = self.csv_manager.find_coupon(coupon_id)
-            if coupon_record:
-                coupon_record.sent_at = sent_at
-                coupon_record.status = 'sent'
-                success = self.csv_manager.update_coupon_status(coupon_id, 'sent', None)
-                
-                if success:
-                    self.logger.info(f"Marked coupon {coupon_id} as sent")
-                return success
-            else:
-                self.logger.error(f"Coupon {coupon_id} not found for marking as sent")
-                return False
-                
+            updated = self.csv_manager.update_coupons_status(coupon_ids, 'sent', sent_at=sent_at)
+            
+            if updated:
+                self.logger.info(f"Marked {updated} coupons as sent")
+            return updated
+            
         except Exception as e:
-            self.logger.error(f"Error marking coupon {coupon_id} as sent: {str(e)}")
-            return False
+            self.logger.error(f"Error marking {len(coupon_ids)} coupons as sent: {str(e)}")
+            return 0
     
     def get_coupon_status(self, coupon_id: str) -> Dict[str, Any]:
         """
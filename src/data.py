@@ -508,15 +508,48 @@ Handles reading and writing coupon data with file locking for concurrent access.
 """
 
 import csv
+import io
 import os
+import re
 import fcntl
+import mmap
+import tempfile
 import json
+import threading
+from collections import OrderedDict
 from datetime import datetime
-from typing import List, Dict, Optional, Any
-from dataclasses import dataclass, asdict
+from typing import List, Dict, Optional, Any, Callable, Iterator
+from dataclasses import dataclass
 from contextlib import contextmanager
 import logging
 
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+except ImportError:  # Optional: uploads are parsed with pandas' C parser instead
+    pa = None
+
+# Basic email format check shared by single-address and bulk validation
+EMAIL_PATTERN = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+EMAIL_RE = re.compile(EMAIL_PATTERN)
+
+# Coupons CSV columns, in file order
+COUPON_FIELDNAMES = ['name', 'email', 'coupon_id', 'verification_code', 'sent_at', 'used_at', 'status']
+
+# Buffer size for bulk CSV writes, so many rows leave in a few large write() calls
+WRITE_BUFFER_SIZE = 1 << 20
+
+# Append-only status change log kept next to the coupons file
+STATUS_LOG_FIELDNAMES = ['coupon_id', 'status', 'sent_at', 'used_at']
+
+# Fold the status log back into the coupons file once it grows past this many bytes
+STATUS_LOG_COMPACT_BYTES = 256 * 1024
+
+# Most recent coupon lookups kept in memory until the coupons file or status log changes
+COUPON_CACHE_SIZE = 8192
+
 
 @dataclass
 class CouponRecord:
@@ -532,7 +565,13 @@ class CouponRecord:
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for CSV writing"""
-        return asdict(self)
+        # The fields are flat strings, so skip asdict()'s recursive deep copy
+        return dict(zip(COUPON_FIELDNAMES, self.to_row()))
+    
+    def to_row(self) -> tuple:
+        """Convert to a tuple in COUPON_FIELDNAMES order for csv.writer"""
+        return (self.name, self.email, self.coupon_id, self.verification_code,
+                self.sent_at, self.used_at, self.status)
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'CouponRecord':
@@ -546,18 +585,29 @@ class CSVManager:
     def __init__(self, coupons_file: str = 'coupons.csv', recipients_file: str = 'responses - Sheet1.csv'):
         self.coupons_file = coupons_file
         self.recipients_file = recipients_file
+        self.status_log_file = f"{os.path.splitext(coupons_file)[0]}_status.csv"
         self.logger = logging.getLogger(__name__)
         
+        # Parsed file contents keyed by path -> ((mtime_ns, size), value)
+        self._read_cache: Dict[str, Any] = {}
+        
+        # Email index with status log entries applied, reused while neither input changes
+        self._merged_coupon_index = (None, None, {})
+        
+        # LRU of found coupons, valid for one (coupons file, status log) signature
+        self._coupon_cache: 'OrderedDict[tuple, CouponRecord]' = OrderedDict()
+        self._coupon_cache_signature = None
+        self._coupon_cache_lock = threading.Lock()
+        
         # Ensure coupons file exists with headers
         self._initialize_coupons_file()
     
     def _initialize_coupons_file(self):
         """Initialize coupons CSV file with headers if it doesn't exist"""
         if not os.path.exists(self.coupons_file):
-            headers = ['name', 'email', 'coupon_id','verification_code', 'sent_at', 'used_at', 'status']
             with open(self.coupons_file, 'w', newline='', encoding='utf-8') as f:
                 writer = csv.writer(f)
-                writer.writerow(headers)
+                writer.writerow(COUPON_FIELDNAMES)
             self.logger.info(f"Created coupons file: {self.coupons_file}")
         else:
             # Check if verification_code column exists, add if missing
@@ -581,7 +631,7 @@ class CSVManager:
                 
                 # Clean fieldnames - remove empty strings and extra spaces
                 clean_fieldnames = [f.strip() for f in fieldnames if f.strip()]
-                expected_fieldnames = ['name', 'email','coupon_id','verification_code', 'sent_at', 'used_at', 'status']
+                expected_fieldnames = COUPON_FIELDNAMES
                 
                 # Check if structure needs fixing
                 needs_fixing = (
@@ -601,11 +651,14 @@ class CSVManager:
     
     def _create_empty_coupons_file(self):
         """Create a new empty coupons file with proper headers"""
-        headers = ['name', 'email','coupon_id',
-                  'verification_code', 'sent_at', 'used_at', 'status']
         with open(self.coupons_file, 'w', newline='', encoding='utf-8') as f:
             writer = csv.writer(f)
-            writer.writerow(headers)
+            writer.writerow(COUPON_FIELDNAMES)
+        
+        # Status changes logged against the old coupons no longer apply
+        if os.path.exists(self.status_log_file):
+            os.remove(self.status_log_file)
+        self._clear_coupon_cache()
         self.logger.info(f"Created new coupons file with proper headers: {self.coupons_file}")
     
     def _fix_csv_structure(self, expected_fieldnames):
@@ -646,11 +699,27 @@ class CSVManager:
             self._create_empty_coupons_file()
     
     @contextmanager
-    def _file_lock(self, file_path: str, mode: str = 'r'):
-        """Context manager for file locking"""
+    def _file_lock(self, file_path: str, mode: str = 'r', buffering: int = -1, lock: Optional[int] = None):
+        """Context manager for file locking, shared for read-only opens and exclusive otherwise"""
+        if lock is None:
+            # Readers only need to exclude writers, so they can hold the lock together
+            lock = fcntl.LOCK_SH if mode == 'r' else fcntl.LOCK_EX
+        
         try:
-            f = open(file_path, mode, newline='', encoding='utf-8')
-            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            while True:
+                f = open(file_path, mode, buffering=buffering, newline='', encoding='utf-8')
+                fcntl.flock(f.fileno(), lock)
+                
+                # A rewrite may have replaced the file while we waited; if so, lock the new one instead
+                try:
+                    path_stat = os.stat(file_path)
+                    locked_stat = os.fstat(f.fileno())
+                    if (path_stat.st_dev, path_stat.st_ino) == (locked_stat.st_dev, locked_stat.st_ino):
+                        break
+                except FileNotFoundError:
+                    pass
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                f.close()
             yield f
         except Exception as e:
             self.logger.error(f"File lock error for {file_path}: {str(e)}")
@@ -662,15 +731,83 @@ class CSVManager:
             except:
                 pass
     
+    def _cached_read(self, file_path: str, loader: Callable[[str], Any]) -> Any:
+        """Return loader(file_path), reusing the previous result while the file is unchanged"""
+        stat = os.stat(file_path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        
+        # A file can have several derived views (rows by email, offsets by ID), one per loader
+        cache_key = (file_path, loader)
+        cached = self._read_cache.get(cache_key)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        
+        value = loader(file_path)
+        self._read_cache[cache_key] = (signature, value)
+        return value
+    
+    def invalidate_cache(self, file_path: Optional[str] = None):
+        """Drop cached file contents (for one file, or all) so the next read goes to disk"""
+        if file_path is None:
+            self._read_cache.clear()
+            return
+        
+        for cache_key in [key for key in self._read_cache if key[0] == file_path]:
+            self._read_cache.pop(cache_key, None)
+    
+    def _file_signature(self, file_path: str) -> Optional[tuple]:
+        """Get (mtime_ns, size) for a file, or None if it doesn't exist"""
+        try:
+            stat = os.stat(file_path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+    
+    def _cached_coupon_lookup(self, key: tuple, lookup: Callable[[], Optional[CouponRecord]]) -> Optional[CouponRecord]:
+        """Return lookup() through the coupon LRU, which resets whenever the coupons file or status log changes"""
+        signature = (self._file_signature(self.coupons_file), self._file_signature(self.status_log_file))
+        with self._coupon_cache_lock:
+            if signature != self._coupon_cache_signature:
+                self._coupon_cache.clear()
+                self._coupon_cache_signature = signature
+            elif key in self._coupon_cache:
+                self._coupon_cache.move_to_end(key)
+                return self._coupon_cache[key]
+        
+        coupon = lookup()
+        
+        # Misses aren't cached, so a coupon saved right after a failed lookup is found next time
+        if coupon is not None:
+            with self._coupon_cache_lock:
+                if self._coupon_cache_signature == signature:
+                    self._coupon_cache[key] = coupon
+                    if len(self._coupon_cache) > COUPON_CACHE_SIZE:
+                        self._coupon_cache.popitem(last=False)
+        return coupon
+    
+    def _clear_coupon_cache(self):
+        """Forget cached coupon lookups after this process changes a coupon"""
+        with self._coupon_cache_lock:
+            self._coupon_cache.clear()
+            self._coupon_cache_signature = None
+    
+    def _load_recipient_emails(self, file_path: str) -> List[tuple]:
+        """Parse the non-empty emails out of a recipients CSV file as (email, lowercased email) pairs"""
+        with self._file_lock(file_path, 'r') as f:
+            # Bulk-parse the email column with pandas' C tokenizer
+            df = pd.read_csv(f, usecols=['email'], dtype=str, keep_default_na=False, index_col=False)
+        
+        emails = df['email'].str.strip()
+        emails = emails[emails != '']
+        # Normalize case once here so lookups downstream are plain dict hits
+        return list(zip(emails.tolist(), emails.str.lower().tolist()))
+    
     def read_recipients(self) -> List[Dict[str, str]]:
         """Read recipient emails from CSV file"""
         recipients = []
         try:
-            with self._file_lock(self.recipients_file, 'r') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    if row.get('email'):
-                        recipients.append({'email': row['email'].strip()})
+            emails = self._cached_read(self.recipients_file, self._load_recipient_emails)
+            recipients = [{'email': email, 'email_lc': email_lc} for email, email_lc in emails]
             
             self.logger.info(f"Read {len(recipients)} recipients from {self.recipients_file}")
             return recipients
@@ -682,31 +819,79 @@ class CSVManager:
             self.logger.error(f"Error reading recipients: {str(e)}")
             return []
     
+    def iter_recipients(self, chunksize: int = 50_000) -> Iterator[Dict[str, str]]:
+        """Stream recipient rows from the CSV file without materializing the whole list"""
+        with self._file_lock(self.recipients_file, 'r') as f:
+            for chunk in pd.read_csv(f, usecols=['email'], dtype=str, keep_default_na=False,
+                                     index_col=False, chunksize=chunksize):
+                emails = chunk['email'].str.strip()
+                emails = emails[emails != '']
+                for email, email_lc in zip(emails.tolist(), emails.str.lower().tolist()):
+                    yield {'email': email, 'email_lc': email_lc}
+    
+    def _count_recipient_emails(self, file_path: str) -> int:
+        """Count the non-empty emails in a recipients CSV file one chunk at a time"""
+        count = 0
+        with self._file_lock(file_path, 'r') as f:
+            for chunk in pd.read_csv(f, usecols=['email'], dtype=str, keep_default_na=False,
+                                     index_col=False, chunksize=50_000):
+                count += int((chunk['email'].str.strip() != '').sum())
+        return count
+    
+    def count_recipients(self) -> int:
+        """Count recipients in the CSV file, cached until the file changes"""
+        try:
+            return self._cached_read(self.recipients_file, self._count_recipient_emails)
+            
+        except FileNotFoundError:
+            self.logger.error(f"Recipients file not found: {self.recipients_file}")
+            return 0
+        except Exception as e:
+            self.logger.error(f"Error counting recipients: {str(e)}")
+            return 0
+    
     def save_coupon(self, coupon: CouponRecord) -> bool:
         """Save a single coupon record to CSV"""
         try:
             with self._file_lock(self.coupons_file, 'a') as f:
-                writer = csv.DictWriter(f, fieldnames=['name','email','coupon_id',
-                    'verification_code', 'sent_at', 'used_at', 'status','coupon_id'
-                ])
-                writer.writerow(coupon.to_dict())
+                stat = os.fstat(f.fileno())
+                csv.writer(f).writerow(coupon.to_row())
+                self._extend_coupon_offsets(f, stat.st_size, (stat.st_mtime_ns, stat.st_size))
             
-            self.logger.info(f"Saved coupon {coupon.coupon_id} for {coupon.email}")
+            self.logger.debug(f"Saved coupon {coupon.coupon_id} for {coupon.email}")
             return True
             
         except Exception as e:
             self.logger.error(f"Error saving coupon {coupon.coupon_id}: {str(e)}")
             return False
     
+    def _format_coupon_rows(self, rows: List[tuple]) -> Optional[str]:
+        """Join coupon rows into CSV text directly, or return None if any field needs quoting"""
+        text = ''.join([f"{name},{email},{coupon_id},{code},{sent_at or ''},{used_at or ''},{status}\r\n"
+                        for name, email, coupon_id, code, sent_at, used_at, status in rows])
+        
+        # UUIDs, codes, emails and ISO timestamps are quote-free; a name with a comma,
+        # quote or line break shows up as an extra separator and needs csv.writer
+        rows_count = len(rows)
+        if ('"' in text or text.count(',') != (len(COUPON_FIELDNAMES) - 1) * rows_count or
+                text.count('\n') != rows_count or text.count('\r') != rows_count):
+            return None
+        return text
+    
     def save_coupons_batch(self, coupons: List[CouponRecord]) -> bool:
         """Save multiple coupon records in batch"""
         try:
-            with self._file_lock(self.coupons_file, 'a') as f:
-                writer = csv.DictWriter(f, fieldnames=['name','email','coupon_id',
-                    'verification_code', 'sent_at', 'used_at', 'status','coupon_id'
-                ])
-                for coupon in coupons:
-                    writer.writerow(coupon.to_dict())
+            # Tuples in column order skip building a dict per coupon and DictWriter's per-field lookups
+            rows = [coupon.to_row() for coupon in coupons]
+            text = self._format_coupon_rows(rows)
+            with self._file_lock(self.coupons_file, 'a', buffering=WRITE_BUFFER_SIZE) as f:
+                stat = os.fstat(f.fileno())
+                if text is None:
+                    csv.writer(f).writerows(rows)
+                else:
+                    f.write(text)
+                # Index only the appended rows rather than rescanning the file on the next lookup
+                self._extend_coupon_offsets(f, stat.st_size, (stat.st_mtime_ns, stat.st_size))
             
             self.logger.info(f"Saved {len(coupons)} coupons in batch")
             return True
@@ -715,14 +900,125 @@ class CSVManager:
             self.logger.error(f"Error saving coupon batch: {str(e)}")
             return False
     
+    def _iter_rows_containing(self, f, needle: bytes) -> Iterator[Dict[str, str]]:
+        """Memory-map an open CSV file and parse only the data lines containing needle"""
+        if not needle or os.fstat(f.fileno()).st_size == 0:
+            return
+        
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            header_end = mm.find(b'\n')
+            if header_end == -1:
+                return
+            fieldnames = next(csv.reader([mm[:header_end].decode('utf-8')]))
+            
+            # Let mmap.find do the scanning in C and only decode candidate lines
+            pos = mm.find(needle, header_end + 1)
+            while pos != -1:
+                line_start = mm.rfind(b'\n', 0, pos) + 1
+                line_end = mm.find(b'\n', pos)
+                if line_end == -1:
+                    line_end = len(mm)
+                
+                line = mm[line_start:line_end].decode('utf-8')
+                row = next(csv.DictReader([line], fieldnames=fieldnames), None)
+                if row is not None:
+                    row.pop(None, None)
+                    yield row
+                
+                pos = mm.find(needle, line_end)
+    
+    def _scan_coupon_offsets(self, mm: mmap.mmap, offsets: Dict[str, Any]):
+        """Add the byte offsets of rows from the mmap's current position to the end into offsets"""
+        fieldnames = offsets['fieldnames']
+        id_column = fieldnames.index('coupon_id') if 'coupon_id' in fieldnames else None
+        code_column = fieldnames.index('verification_code') if 'verification_code' in fieldnames else None
+        
+        while True:
+            offset = mm.tell()
+            line = mm.readline()
+            if not line:
+                break
+            
+            values = next(csv.reader([line.decode('utf-8')]), [])
+            if id_column is not None and id_column < len(values):
+                # Keep the first row per ID, matching the old linear scan
+                offsets['by_id'].setdefault(values[id_column], offset)
+            if code_column is not None and code_column < len(values):
+                offsets['by_code'].setdefault(values[code_column].strip(), []).append(offset)
+    
+    def _build_coupon_offsets(self, file_path: str) -> Dict[str, Any]:
+        """Scan a coupons CSV file once and index row byte offsets by coupon ID and verification code"""
+        offsets = {'fieldnames': [], 'by_id': {}, 'by_code': {}}
+        with self._file_lock(file_path, 'r') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return offsets
+            
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                offsets['fieldnames'] = next(csv.reader([mm.readline().decode('utf-8')]), [])
+                self._scan_coupon_offsets(mm, offsets)
+        
+        return offsets
+    
+    def _extend_coupon_offsets(self, f, start: int, signature: tuple):
+        """Index rows just appended to the locked coupons file, if the cached offsets were current before"""
+        cache_key = (self.coupons_file, self._build_coupon_offsets)
+        cached = self._read_cache.get(cache_key)
+        if cached is None or cached[0] != signature or start == 0:
+            # Nothing cached to extend; the next lookup builds the index from scratch
+            return
+        
+        f.flush()
+        offsets = cached[1]
+        # The append handle is write-only, so map the new rows through a separate read handle
+        with open(self.coupons_file, 'rb') as rf, mmap.mmap(rf.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            mm.seek(start)
+            self._scan_coupon_offsets(mm, offsets)
+        
+        stat = os.fstat(f.fileno())
+        self._read_cache[cache_key] = ((stat.st_mtime_ns, stat.st_size), offsets)
+    
+    def _read_rows_at(self, file_path: str, fieldnames: List[str], row_offsets: List[int]) -> List[Dict[str, str]]:
+        """Read and parse the coupon rows starting at the given byte offsets"""
+        rows = []
+        with self._file_lock(file_path, 'r') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return rows
+            
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for offset in row_offsets:
+                    if offset >= size:
+                        continue
+                    line_end = mm.find(b'\n', offset)
+                    line = mm[offset:line_end if line_end != -1 else size].decode('utf-8')
+                    row = next(csv.DictReader([line], fieldnames=fieldnames), None)
+                    if row is not None:
+                        row.pop(None, None)
+                        rows.append(row)
+        
+        return rows
+    
     def find_coupon(self, coupon_id: str) -> Optional[CouponRecord]:
         """Find a coupon by ID"""
+        return self._cached_coupon_lookup(('id', coupon_id), lambda: self._find_coupon_on_disk(coupon_id))
+    
+    def _find_coupon_on_disk(self, coupon_id: str) -> Optional[CouponRecord]:
+        """Find a coupon by ID through the byte-offset index"""
         try:
+            offsets = self._cached_read(self.coupons_file, self._build_coupon_offsets)
+            offset = offsets['by_id'].get(coupon_id)
+            if offset is None:
+                return None
+            
+            for row in self._read_rows_at(self.coupons_file, offsets['fieldnames'], [offset]):
+                if row.get('coupon_id') == coupon_id:
+                    return CouponRecord.from_dict(self._apply_status_log(row))
+            
+            # The file was rewritten under the cached offsets; fall back to a scan
             with self._file_lock(self.coupons_file, 'r') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
+                for row in self._iter_rows_containing(f, coupon_id.encode('utf-8')):
                     if row.get('coupon_id') == coupon_id:
-                        return CouponRecord.from_dict(row)
+                        return CouponRecord.from_dict(self._apply_status_log(row))
             
             return None
             
@@ -732,13 +1028,29 @@ class CSVManager:
     
     def find_coupon_by_verification_code(self, verification_code: str, email: str) -> Optional[CouponRecord]:
         """Find a coupon by verification code and email for security"""
+        return self._cached_coupon_lookup(
+            ('code', verification_code, email.lower()),
+            lambda: self._find_coupon_by_verification_code_on_disk(verification_code, email))
+    
+    def _find_coupon_by_verification_code_on_disk(self, verification_code: str, email: str) -> Optional[CouponRecord]:
+        """Find a coupon by verification code and email through the byte-offset index"""
         try:
+            offsets = self._cached_read(self.coupons_file, self._build_coupon_offsets)
+            row_offsets = offsets['by_code'].get(verification_code)
+            if not row_offsets:
+                return None
+            
+            for row in self._read_rows_at(self.coupons_file, offsets['fieldnames'], row_offsets):
+                if ((row.get('verification_code') or '').strip() == verification_code and 
+                    (row.get('email') or '').lower() == email.lower()):
+                    return CouponRecord.from_dict(self._apply_status_log(row))
+            
+            # The file was rewritten under the cached offsets; fall back to a scan
             with self._file_lock(self.coupons_file, 'r') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    if (row.get('verification_code').strip() == verification_code and 
-                        row.get('email', '').lower() == email.lower()):
-                        return CouponRecord.from_dict(row)
+                for row in self._iter_rows_containing(f, verification_code.encode('utf-8')):
+                    if ((row.get('verification_code') or '').strip() == verification_code and 
+                        (row.get('email') or '').lower() == email.lower()):
+                        return CouponRecord.from_dict(self._apply_status_log(row))
             
             return None
             
@@ -746,40 +1058,209 @@ class CSVManager:
             self.logger.error(f"Error finding coupon by verification code: {str(e)}")
             return None
     
+    def _build_coupon_index(self, file_path: str) -> Dict[str, Dict[str, str]]:
+        """Scan a coupons CSV file and index its rows by lowercased email"""
+        index = {}
+        with self._file_lock(file_path, 'r') as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                email = (row.get('email') or '').strip().lower()
+                if email:
+                    # Keep the first coupon per email, matching the old linear scan
+                    index.setdefault(email, row)
+        
+        return index
+    
+    def load_coupon_index(self) -> Dict[str, Dict[str, str]]:
+        """Get coupon rows indexed by lowercased email, cached until the file changes"""
+        try:
+            index = self._cached_read(self.coupons_file, self._build_coupon_index)
+            status_log = self._load_status_log()
+            if not status_log:
+                return index
+            
+            cached_index, cached_log, merged = self._merged_coupon_index
+            if cached_index is index and cached_log is status_log:
+                return merged
+            
+            # Overlay logged status changes on copies so the cached file index stays as on disk
+            merged = dict(index)
+            for email, row in index.items():
+                changes = status_log.get(row.get('coupon_id'))
+                if changes:
+                    merged[email] = {**row, **changes}
+            self._merged_coupon_index = (index, status_log, merged)
+            return merged
+            
+        except FileNotFoundError:
+            # No coupons generated yet
+            return {}
+        except Exception as e:
+            self.logger.error(f"Error loading coupon index: {str(e)}")
+            return {}
+    
+    def _parse_status_log(self, file_path: str) -> Dict[str, Dict[str, str]]:
+        """Replay a status log file into the latest changed fields per coupon ID"""
+        with self._file_lock(file_path, 'r') as f:
+            return self._parse_status_log_rows(f)
+    
+    def _parse_status_log_rows(self, f) -> Dict[str, Dict[str, str]]:
+        """Replay status log lines from an open file into the latest changed fields per coupon ID"""
+        changes = {}
+        for row in csv.reader(f):
+            if len(row) < len(STATUS_LOG_FIELDNAMES):
+                row = (row + [''] * len(STATUS_LOG_FIELDNAMES))[:len(STATUS_LOG_FIELDNAMES)]
+            coupon_id, status, sent_at, used_at = row[:len(STATUS_LOG_FIELDNAMES)]
+            if not coupon_id or not status:
+                continue
+            
+            entry = changes.setdefault(coupon_id, {})
+            entry['status'] = status
+            # Timestamps are only logged when set, so keep earlier ones otherwise
+            if sent_at:
+                entry['sent_at'] = sent_at
+            if used_at:
+                entry['used_at'] = used_at
+        
+        return changes
+    
+    def _load_status_log(self) -> Dict[str, Dict[str, str]]:
+        """Get status changes not yet folded into the coupons file, cached until the log changes"""
+        try:
+            return self._cached_read(self.status_log_file, self._parse_status_log)
+        except FileNotFoundError:
+            return {}
+    
+    def _apply_status_log(self, row: Dict[str, str]) -> Dict[str, str]:
+        """Update a coupon row in place with any logged status changes"""
+        changes = self._load_status_log().get(row.get('coupon_id'))
+        if changes:
+            row.update(changes)
+        return row
+    
     def update_coupon_status(self, coupon_id: str, status: str, used_at: Optional[str] = None) -> bool:
         """Update coupon status and usage timestamp"""
         try:
-            # Read all coupons
-            coupons = []
-            updated = False
-            
-            with self._file_lock(self.coupons_file, 'r') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    if row.get('coupon_id') == coupon_id:
-                        row['status'] = status
-                        if used_at:
-                            row['used_at'] = used_at
-                        updated = True
-                    coupons.append(row)
-            
-            if not updated:
+            offsets = self._cached_read(self.coupons_file, self._build_coupon_offsets)
+            if coupon_id not in offsets['by_id']:
                 self.logger.warning(f"Coupon {coupon_id} not found for status update")
                 return False
             
-            # Write back all coupons
-            with self._file_lock(self.coupons_file, 'w') as f:
-                if coupons:
-                    writer = csv.DictWriter(f, fieldnames=coupons[0].keys())
-                    writer.writeheader()
-                    writer.writerows(coupons)
+            # Append one line to the status log instead of rewriting the whole coupons file
+            with self._file_lock(self.status_log_file, 'a') as f:
+                csv.writer(f).writerow((coupon_id, status, '', used_at or ''))
+                log_size = f.tell()
+            self._clear_coupon_cache()
             
-            self.logger.info(f"Updated coupon {coupon_id} status to {status}")
-            return True
+            self.logger.debug(f"Updated coupon {coupon_id} status to {status}")
             
         except Exception as e:
             self.logger.error(f"Error updating coupon {coupon_id}: {str(e)}")
             return False
+        
+        if log_size > STATUS_LOG_COMPACT_BYTES:
+            self.compact_status_log()
+        return True
+    
+    def _rewrite_coupons(self, pending: set, status: Optional[str] = None,
+                         sent_at: Optional[str] = None, used_at: Optional[str] = None) -> int:
+        """Rewrite the coupons file with the status log folded in and pending IDs set to status"""
+        updated = 0
+        
+        # Hold both locks across the read-modify-write so no update can land between read and replace
+        with self._file_lock(self.coupons_file, 'r', lock=fcntl.LOCK_EX) as f, \
+                self._file_lock(self.status_log_file, 'a+') as log:
+            log.seek(0)
+            status_log = self._parse_status_log_rows(log)
+            
+            # Positional rows skip a dict per coupon; only four columns are ever touched
+            reader = csv.reader(f)
+            fieldnames = next(reader, None) or COUPON_FIELDNAMES
+            columns = {name: index for index, name in enumerate(fieldnames)}
+            width = len(fieldnames)
+            id_column = columns['coupon_id']
+            status_column = columns['status']
+            sent_column = columns['sent_at']
+            used_column = columns['used_at']
+            
+            coupons = []
+            for row in reader:
+                if not row:
+                    continue  # Blank lines, which DictReader skipped as well
+                if len(row) != width:
+                    row = (row + [''] * width)[:width]  # Pad short and trim malformed rows
+                
+                coupon_id = row[id_column]
+                changes = status_log.get(coupon_id)
+                if changes:
+                    for name, value in changes.items():
+                        row[columns[name]] = value
+                if coupon_id in pending:
+                    row[status_column] = status
+                    if sent_at:
+                        row[sent_column] = sent_at
+                    if used_at:
+                        row[used_column] = used_at
+                    updated += 1
+                coupons.append(row)
+            
+            if updated or status_log:
+                # Write a new file beside the old one and swap it in, so a crash or full disk
+                # mid-write leaves the previous coupons file intact
+                directory = os.path.dirname(os.path.abspath(self.coupons_file))
+                fd, temp_filename = tempfile.mkstemp(dir=directory, suffix='.csv.tmp')
+                try:
+                    with os.fdopen(fd, 'w', buffering=WRITE_BUFFER_SIZE, newline='', encoding='utf-8') as temp_f:
+                        writer = csv.writer(temp_f)
+                        writer.writerow(fieldnames)
+                        writer.writerows(coupons)
+                        temp_f.flush()
+                        os.fsync(temp_f.fileno())
+                    os.chmod(temp_filename, os.fstat(f.fileno()).st_mode & 0o7777)
+                    os.replace(temp_filename, self.coupons_file)
+                except Exception:
+                    os.unlink(temp_filename)
+                    raise
+                
+                # Make the rename durable before dropping the log entries it now contains
+                dir_fd = os.open(directory, os.O_RDONLY)
+                try:
+                    os.fsync(dir_fd)
+                finally:
+                    os.close(dir_fd)
+                
+                log.truncate(0)
+                os.fsync(log.fileno())
+                self._clear_coupon_cache()
+        
+        return updated
+    
+    def compact_status_log(self) -> bool:
+        """Fold logged status changes into the coupons file and empty the log"""
+        try:
+            self._rewrite_coupons(set())
+            self.logger.info(f"Compacted status log into {self.coupons_file}")
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"Error compacting status log: {str(e)}")
+            return False
+    
+    def update_coupons_status(self, coupon_ids: List[str], status: str,
+                              sent_at: Optional[str] = None, used_at: Optional[str] = None) -> int:
+        """Update many coupons with a single read and rewrite of the coupons file"""
+        pending = set(coupon_ids)
+        if not pending:
+            return 0
+        
+        try:
+            updated = self._rewrite_coupons(pending, status, sent_at=sent_at, used_at=used_at)
+            self.logger.info(f"Updated {updated} of {len(pending)} coupons to status {status}")
+            return updated
+            
+        except Exception as e:
+            self.logger.error(f"Error updating coupon batch to {status}: {str(e)}")
+            return 0
     
     def get_coupon_stats(self) -> Dict[str, int]:
         """Get statistics about coupon usage"""
@@ -792,11 +1273,28 @@ class CSVManager:
         }
         
         try:
+            status_log = self._load_status_log()
             with self._file_lock(self.coupons_file, 'r') as f:
-                reader = csv.DictReader(f)
+                # Read positionally: only the ID and status columns matter here
+                reader = csv.reader(f)
+                fieldnames = next(reader, [])
+                id_column = fieldnames.index('coupon_id') if 'coupon_id' in fieldnames else None
+                status_column = fieldnames.index('status') if 'status' in fieldnames else None
+                
                 for row in reader:
+                    if not row:
+                        continue  # Blank lines, which DictReader skipped as well
                     stats['total'] += 1
-                    status = row.get('status', 'generated')
+                    
+                    changes = None
+                    if status_log and id_column is not None and id_column < len(row):
+                        changes = status_log.get(row[id_column])
+                    if changes:
+                        status = changes['status']
+                    elif status_column is None:
+                        status = 'generated'
+                    else:
+                        status = row[status_column] if status_column < len(row) else None
                     if status in stats:
                         stats[status] += 1
             
@@ -808,12 +1306,47 @@ class CSVManager:
     
     def validate_email_format(self, email: str) -> bool:
         """Basic email format validation"""
-        import re
-        pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-        return re.match(pattern, email.strip()) is not None
+        return EMAIL_RE.match(email.strip()) is not None
     
     def validate_recipients_file(self, file_path: str) -> Dict[str, Any]:
         """Validate recipients CSV file and return statistics"""
+        try:
+            with open(file_path, 'rb') as f:
+                content = f.read()
+        except Exception as e:
+            return {
+                'valid': False,
+                'total_rows': 0,
+                'valid_emails': 0,
+                'invalid_emails': 0,
+                'errors': [f"Error reading file: {str(e)}"]
+            }
+        
+        return self.validate_recipients_content(content)
+    
+    def _parse_email_column(self, content: bytes) -> Optional[pd.Series]:
+        """Parse the email column out of raw CSV content, or None if there is no such column"""
+        if pa is not None:
+            try:
+                # Arrow's multi-threaded parser; a plain Series keeps the .str ops working on pandas 1.5
+                table = pa_csv.read_csv(io.BytesIO(content), convert_options=pa_csv.ConvertOptions(
+                    include_columns=['email'], column_types={'email': pa.string()}))
+                return table.column('email').to_pandas()
+            except pa.ArrowException:
+                # Empty files, missing columns and ragged rows go through pandas for the usual results
+                pass
+        
+        try:
+            # index_col=False keeps rows with extra trailing fields aligned, like csv.DictReader
+            df = pd.read_csv(io.BytesIO(content), dtype=str, keep_default_na=False, encoding='utf-8',
+                             index_col=False, usecols=lambda column: column == 'email')
+        except pd.errors.EmptyDataError:
+            return None
+        
+        return df['email'] if 'email' in df.columns else None
+    
+    def validate_recipients_content(self, content: bytes) -> Dict[str, Any]:
+        """Validate raw recipients CSV content and return statistics"""
         result = {
             'valid': False,
             'total_rows': 0,
@@ -823,26 +1356,24 @@ class CSVManager:
         }
         
         try:
-            with open(file_path, 'r', newline='', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                
-                if not reader.fieldnames or 'email' not in reader.fieldnames:
-                    result['errors'].append("CSV must have 'email' column")
-                    return result
-                
-                for i, row in enumerate(reader, 1):
-                    result['total_rows'] += 1
-                    email = row.get('email', '').strip()
-                    
-                    if not email:
-                        result['invalid_emails'] += 1
-                        continue
-                    
-                    if self.validate_email_format(email):
-                        result['valid_emails'] += 1
-                    else:
-                        result['invalid_emails'] += 1
-                        result['errors'].append(f"Invalid email format at row {i}: {email}")
+            emails = self._parse_email_column(content)
+            if emails is None:
+                result['errors'].append("CSV must have 'email' column")
+                return result
+            
+            # Classify every row in one vectorized pass instead of a regex call per row
+            emails = emails.fillna('').str.strip()
+            present = emails != ''
+            well_formed = emails.str.match(EMAIL_PATTERN)
+            malformed = emails[present & ~well_formed]
+            
+            result['total_rows'] = len(emails)
+            result['valid_emails'] = int((present & well_formed).sum())
+            result['invalid_emails'] = result['total_rows'] - result['valid_emails']
+            result['errors'].extend(
+                f"Invalid email format at row {row + 1}: {email}"
+                for row, email in zip(malformed.index, malformed.tolist())
+            )
             
             result['valid'] = result['valid_emails'] > 0
             
@@ -851,6 +1382,21 @@ class CSVManager:
         
         return result
     
+    def replace_recipients_file(self, content: bytes):
+        """Atomically replace the recipients file with already-validated content"""
+        directory = os.path.dirname(os.path.abspath(self.recipients_file))
+        fd, temp_filename = tempfile.mkstemp(dir=directory, suffix='.csv.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(content)
+            os.replace(temp_filename, self.recipients_file)
+        except Exception:
+            os.unlink(temp_filename)
+            raise
+        
+        self.invalidate_cache()
+        self.logger.info(f"Replaced recipients file: {self.recipients_file}")
+    
     def reset_coupons_for_fresh_upload(self):
         """Reset coupons file when uploading a fresh recipients CSV"""
         try:
@@ -872,6 +1418,8 @@ class CSVManager:
             
             if os.path.exists(self.coupons_file):
                 import shutil
+                # Fold pending status changes in so the backup is self-contained
+                self.compact_status_log()
                 shutil.copy2(self.coupons_file, backup_filename)
                 self.logger.info(f"Created backup: {backup_filename}")
                 return backup_filename
@@ -913,7 +1461,7 @@ class CSVManager:
                         
                         if rows:
                             # Get the most recent coupon
-                            last_row = rows[-1]
+                            last_row = self._apply_status_log(rows[-1])
                             status['last_coupon_generated'] = {
                                 'email': last_row.get('email'),
                                 'verification_code': last_row.get('verification_code'),
@@ -980,6 +1528,7 @@ class CSVManager:
             
             with open('organizer_credentials.json', 'w') as f:
                 json.dump(organizer_data, f, indent=2)
+            self.invalidate_cache('organizer_credentials.json')
             
             self.logger.info(f"Saved organizer credentials for {user_info.get('email')} for event: {event_name}")
             return True
@@ -988,14 +1537,19 @@ class CSVManager:
             self.logger.error(f"Error saving organizer credentials: {str(e)}")
             return False
     
+    def _load_json(self, file_path: str) -> Any:
+        """Parse a JSON file"""
+        with open(file_path, 'r') as f:
+            return json.load(f)
+    
     def get_organizer_credentials(self) -> Optional[Dict[str, Any]]:
         """Retrieve stored organizer credentials"""
         try:
             if not os.path.exists('organizer_credentials.json'):
                 return None
-                
-            with open('organizer_credentials.json', 'r') as f:
-                return json.load(f)
+            
+            # Looked up on every coupon scan, but only rewritten when a campaign is sent
+            return self._cached_read('organizer_credentials.json', self._load_json)
                 
         except Exception as e:
             self.logger.error(f"Error loading organizer credentials: {str(e)}")
@@ -0,0 +1,94 @@
+"""Tests for the byte-offset coupon index behind find_coupon lookups"""
+import csv
+
+import pytest
+
+from src.data import CSVManager, CouponRecord
+
+
+@pytest.fixture
+def manager(tmp_path):
+    """A CSVManager with one saved coupon and its offset index built"""
+    manager = CSVManager(str(tmp_path / 'coupons.csv'), str(tmp_path / 'recipients.csv'))
+    manager.save_coupon(CouponRecord('Alice', 'alice@example.com', 'COUPON-A', '111111'))
+    assert manager.find_coupon('COUPON-A') is not None
+    return manager
+
+
+def cached_offsets(manager):
+    """The (signature, offsets) entry the lookups are served from"""
+    return manager._read_cache[(manager.coupons_file, manager._build_coupon_offsets)]
+
+
+def test_batch_save_extends_index(manager):
+    coupons = [
+        CouponRecord('Bob', 'bob@example.com', 'COUPON-B', '222222'),
+        CouponRecord('Carol', 'carol@example.com', 'COUPON-C', '333333'),
+    ]
+    assert manager._format_coupon_rows([coupon.to_row() for coupon in coupons]) is not None
+    _, offsets = cached_offsets(manager)
+
+    assert manager.save_coupons_batch(coupons)
+
+    # The appended rows were indexed in place instead of rebuilding from scratch
+    signature, extended = cached_offsets(manager)
+    assert extended is offsets
+    assert signature == manager._file_signature(manager.coupons_file)
+    assert {'COUPON-B', 'COUPON-C'} <= set(offsets['by_id'])
+
+    assert manager.find_coupon('COUPON-B').email == 'bob@example.com'
+    assert manager.find_coupon('COUPON-C').name == 'Carol'
+    assert manager.find_coupon_by_verification_code('333333', 'carol@example.com').coupon_id == 'COUPON-C'
+    assert manager.find_coupon('COUPON-A').name == 'Alice'
+
+
+def test_batch_save_with_quoted_names_extends_index(manager):
+    coupons = [
+        CouponRecord('Smith, Dana', 'dana@example.com', 'COUPON-D', '444444'),
+        CouponRecord('Eve "E" Jones', 'eve@example.com', 'COUPON-E', '555555'),
+    ]
+    # These names take the csv.writer fallback rather than the joined-text fast path
+    assert manager._format_coupon_rows([coupon.to_row() for coupon in coupons]) is None
+    _, offsets = cached_offsets(manager)
+
+    assert manager.save_coupons_batch(coupons)
+
+    assert cached_offsets(manager)[1] is offsets
+    assert manager.find_coupon('COUPON-D').name == 'Smith, Dana'
+    assert manager.find_coupon('COUPON-E').name == 'Eve "E" Jones'
+    coupon = manager.find_coupon_by_verification_code('555555', 'EVE@example.com')
+    assert coupon.coupon_id == 'COUPON-E'
+    assert coupon.name == 'Eve "E" Jones'
+
+    # The fallback still writes valid CSV
+    with open(manager.coupons_file, newline='', encoding='utf-8') as f:
+        names = [row['name'] for row in csv.DictReader(f)]
+    assert names == ['Alice', 'Smith, Dana', 'Eve "E" Jones']
+
+
+def test_external_write_forces_rebuild(manager):
+    _, offsets = cached_offsets(manager)
+
+    # Another process appends a row behind this manager's back
+    with open(manager.coupons_file, 'a', newline='', encoding='utf-8') as f:
+        csv.writer(f).writerow(CouponRecord('Frank', 'frank@example.com', 'COUPON-F', '666666').to_row())
+
+    assert manager.find_coupon('COUPON-F').name == 'Frank'
+    assert cached_offsets(manager)[1] is not offsets
+    assert manager.find_coupon_by_verification_code('666666', 'frank@example.com').coupon_id == 'COUPON-F'
+
+
+def test_stale_signature_forces_rebuild(manager):
+    cache_key = (manager.coupons_file, manager._build_coupon_offsets)
+    stale = {'fieldnames': [], 'by_id': {}, 'by_code': {}}
+    manager._read_cache[cache_key] = ((0, 0), stale)
+
+    # An append must not extend offsets that no longer describe the file
+    assert manager.save_coupons_batch([CouponRecord('Grace', 'grace@example.com', 'COUPON-G', '777777')])
+    assert stale['by_id'] == {}
+
+    assert manager.find_coupon('COUPON-G').name == 'Grace'
+    assert manager.find_coupon('COUPON-A').name == 'Alice'
+    signature, offsets = manager._read_cache[cache_key]
+    assert offsets is not stale
+    assert signature == manager._file_signature(manager.coupons_file)
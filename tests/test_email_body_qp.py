@@ -0,0 +1,48 @@
+"""Tests for the pre-encoded quoted-printable email body"""
+import os
+import quopri
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'automated_mail'))
+
+from automated_mail import create_email_body, create_email_body_qp  # noqa: E402
+
+
+NAMES = [
+    'Alice',
+    'José Müller',
+    'Zoë Ångström-Łukasiewicz',
+    '山田 太郎',
+    'Priya 🎉',
+    'a=b == c=',
+    '=3D literally',
+    'Trailing space ',
+    'Tab\tname',
+    'N' * 200,
+    'Ünïcödé ' * 40,
+]
+
+
+@pytest.mark.parametrize('name', NAMES)
+def test_qp_body_decodes_to_plain_body(name):
+    encoded = create_email_body_qp(name, '123456')
+
+    decoded = quopri.decodestring(encoded.encode('ascii')).decode('utf-8')
+    assert decoded == create_email_body(name, '123456')
+
+
+@pytest.mark.parametrize('name', NAMES)
+def test_qp_body_lines_fit_rfc_limit(name):
+    encoded = create_email_body_qp(name, '123456')
+
+    for line in encoded.split('\n'):
+        assert len(line) <= 76, line
+
+
+def test_qp_body_is_ascii():
+    encoded = create_email_body_qp('José 山田 =', '654321')
+
+    encoded.encode('ascii')
+    assert '654321' in encoded
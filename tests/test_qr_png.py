@@ -0,0 +1,79 @@
+"""Tests for the direct QR matrix to PNG encoder"""
+import base64
+import io
+
+import numpy as np
+import pytest
+from PIL import Image
+
+from src.coupons import _encode_qr_png, _get_qr_builder, _qr_payload, _render_qr_png_base64
+
+
+PAYLOADS = [
+    _qr_payload('123456', 'a@b.co'),
+    _qr_payload('654321', 'firstname.lastname+events@example-university.ac.in'),
+    _qr_payload('000000', 'josé.müller@example.com'),
+    'x' * 600,
+]
+
+
+def decode_png(png):
+    image = Image.open(io.BytesIO(png))
+    image.load()
+    return image
+
+
+def make_reference(data, box_size=10):
+    """Render data the way qrcode/Pillow would, returning the builder and its image"""
+    qr = _get_qr_builder()
+    qr.box_size = box_size
+    qr.add_data(data)
+    qr.make(fit=True)
+    return qr, qr.make_image()
+
+
+@pytest.fixture(autouse=True)
+def reset_builder():
+    yield
+    _get_qr_builder().box_size = 10
+
+
+@pytest.mark.parametrize('data', PAYLOADS)
+def test_png_matches_qrcode_image(data):
+    qr, reference = make_reference(data)
+    # Every QR size is an odd module count, so 10px boxes never fill whole bytes per row
+    assert reference.size[0] % 8 != 0
+
+    image = decode_png(_encode_qr_png(qr.get_matrix(), qr.box_size))
+
+    assert image.mode == '1'
+    assert image.size == reference.size
+    assert np.array_equal(np.asarray(image.convert('L')), np.asarray(reference.convert('L')))
+
+
+@pytest.mark.parametrize('box_size', [1, 3, 8])
+def test_png_matches_qrcode_image_for_other_box_sizes(box_size):
+    qr, reference = make_reference(PAYLOADS[1], box_size)
+
+    image = decode_png(_encode_qr_png(qr.get_matrix(), qr.box_size))
+
+    assert image.size == reference.size
+    assert np.array_equal(np.asarray(image.convert('L')), np.asarray(reference.convert('L')))
+
+
+def test_small_matrix_pixels():
+    matrix = [[True, False, True], [False, True, False], [True, True, False]]
+
+    image = decode_png(_encode_qr_png(matrix, 3))
+
+    assert image.size == (9, 9)
+    expected = np.repeat(np.repeat(np.where(matrix, 0, 255), 3, axis=0), 3, axis=1)
+    assert np.array_equal(np.asarray(image.convert('L')), expected)
+
+
+def test_render_base64_round_trips():
+    data = PAYLOADS[0]
+    image = decode_png(base64.b64decode(_render_qr_png_base64(data)))
+
+    _, reference = make_reference(data)
+    assert np.array_equal(np.asarray(image.convert('L')), np.asarray(reference.convert('L')))
@@ -0,0 +1,57 @@
+"""Tests for the process pool that renders large QR batches"""
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from src.coupons import CouponManager, _qr_payload, _render_qr_png_base64
+from src.data import CSVManager
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    """A CouponManager that takes the parallel path regardless of the host's core count"""
+    monkeypatch.setattr('os.cpu_count', lambda: 4)
+    manager = CouponManager(CSVManager(str(tmp_path / 'coupons.csv'), str(tmp_path / 'recipients.csv')))
+    yield manager
+    if manager._qr_pool is not None:
+        manager._qr_pool.shutdown()
+
+
+class BrokenPool:
+    """Stands in for a pool whose worker died"""
+
+    def __init__(self):
+        self.shut_down = False
+
+    def map(self, *args, **kwargs):
+        raise BrokenProcessPool('A child process terminated abruptly')
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self.shut_down = True
+
+
+def test_pool_does_not_fork(manager):
+    pool = manager._get_qr_pool()
+
+    assert pool._mp_context.get_start_method() in ('forkserver', 'spawn')
+    assert manager._get_qr_pool() is pool
+
+
+def test_parallel_render_matches_serial(manager):
+    payloads = [_qr_payload(f'{i:06d}', f'user{i}@example.com') for i in range(CouponManager.QR_PARALLEL_THRESHOLD)]
+
+    assert manager.create_qr_codes(payloads) == [_render_qr_png_base64(payload) for payload in payloads]
+    assert manager._qr_pool is not None
+
+
+def test_broken_pool_is_replaced(manager):
+    broken = BrokenPool()
+    manager._qr_pool = broken
+    payloads = ['x'] * CouponManager.QR_PARALLEL_THRESHOLD
+
+    with pytest.raises(BrokenProcessPool):
+        manager.create_qr_codes(payloads)
+
+    assert broken.shut_down
+    assert manager._qr_pool is None
+    assert manager.create_qr_codes(payloads) == [_render_qr_png_base64('x')] * len(payloads)
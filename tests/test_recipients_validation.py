@@ -0,0 +1,53 @@
+"""Tests for recipients CSV validation on upload"""
+import pandas as pd
+import pytest
+
+from src.data import CSVManager
+
+
+VALID_CSV = (
+    b'name,email,mobile\r\n'
+    b'Alice,alice@example.com,9999999999\r\n'
+    b'Bob, bob@example.org ,8888888888\r\n'
+    b'Carol,not-an-email,7777777777\r\n'
+    b'Dave,,6666666666\r\n'
+    b'Eve,eve.smith+events@uni.ac.in,5555555555\r\n'
+)
+
+
+@pytest.fixture
+def manager(tmp_path):
+    return CSVManager(str(tmp_path / 'coupons.csv'), str(tmp_path / 'recipients.csv'))
+
+
+def assert_valid_csv_result(result):
+    assert result['valid']
+    assert result['total_rows'] == 5
+    assert result['valid_emails'] == 3
+    assert result['invalid_emails'] == 2
+    assert result['errors'] == ['Invalid email format at row 3: not-an-email']
+
+
+def test_validation_through_pyarrow(manager, monkeypatch):
+    pytest.importorskip('pyarrow')
+
+    def no_pandas_parse(*args, **kwargs):
+        raise AssertionError('expected the pyarrow parser, not the pandas fallback')
+
+    monkeypatch.setattr(pd, 'read_csv', no_pandas_parse)
+
+    assert_valid_csv_result(manager.validate_recipients_content(VALID_CSV))
+
+
+def test_validation_through_pandas_fallback(manager, monkeypatch):
+    monkeypatch.setattr('src.data.pa', None)
+
+    assert_valid_csv_result(manager.validate_recipients_content(VALID_CSV))
+
+
+@pytest.mark.parametrize('content', [b'', b'name,mobile\r\nAlice,9999999999\r\n'])
+def test_missing_email_column(manager, content):
+    result = manager.validate_recipients_content(content)
+
+    assert not result['valid']
+    assert result['errors'] == ["CSV must have 'email' column"]
@@ -0,0 +1,113 @@
+"""Tests for the coupon status log that overlays coupons.csv"""
+import csv
+import os
+
+import pytest
+
+from src.data import CSVManager, CouponRecord, COUPON_FIELDNAMES
+
+
+@pytest.fixture
+def manager(tmp_path):
+    """A CSVManager over a coupons file holding two generated coupons"""
+    manager = CSVManager(str(tmp_path / 'coupons.csv'), str(tmp_path / 'recipients.csv'))
+    manager.save_coupons_batch([
+        CouponRecord('Alice', 'alice@example.com', 'COUPON-A', '111111'),
+        CouponRecord('Bob', 'bob@example.com', 'COUPON-B', '222222'),
+    ])
+    return manager
+
+
+def read_coupon_rows(manager):
+    with open(manager.coupons_file, newline='', encoding='utf-8') as f:
+        return {row['coupon_id']: row for row in csv.DictReader(f)}
+
+
+def test_status_append_is_visible_to_lookups(manager):
+    # Prime every cache before the update so the test also covers invalidation
+    assert manager.find_coupon('COUPON-A').status == 'generated'
+    assert manager.find_coupon_by_verification_code('111111', 'alice@example.com').status == 'generated'
+    assert manager.load_coupon_index()['alice@example.com']['status'] == 'generated'
+    assert manager.get_coupon_stats()['used'] == 0
+
+    assert manager.update_coupon_status('COUPON-A', 'used', '2024-01-01 10:00:00')
+
+    # The change went to the log, not into coupons.csv
+    assert os.path.getsize(manager.status_log_file) > 0
+    assert read_coupon_rows(manager)['COUPON-A']['status'] == 'generated'
+
+    coupon = manager.find_coupon('COUPON-A')
+    assert coupon.status == 'used'
+    assert coupon.used_at == '2024-01-01 10:00:00'
+
+    coupon = manager.find_coupon_by_verification_code('111111', 'ALICE@example.com')
+    assert coupon.status == 'used'
+    assert coupon.used_at == '2024-01-01 10:00:00'
+
+    index = manager.load_coupon_index()
+    assert index['alice@example.com']['status'] == 'used'
+    assert index['alice@example.com']['used_at'] == '2024-01-01 10:00:00'
+    assert index['bob@example.com']['status'] == 'generated'
+
+    stats = manager.get_coupon_stats()
+    assert stats['total'] == 2
+    assert stats['used'] == 1
+    assert stats['generated'] == 1
+
+
+def test_later_log_entries_win(manager):
+    manager.update_coupon_status('COUPON-B', 'sent')
+    manager.update_coupon_status('COUPON-B', 'used', '2024-01-02 09:30:00')
+
+    coupon = manager.find_coupon('COUPON-B')
+    assert coupon.status == 'used'
+    assert coupon.used_at == '2024-01-02 09:30:00'
+
+
+def test_unknown_coupon_is_not_logged(manager):
+    assert not manager.update_coupon_status('COUPON-MISSING', 'used')
+    assert not os.path.exists(manager.status_log_file) or os.path.getsize(manager.status_log_file) == 0
+
+
+def test_compaction_folds_log_into_coupons_file(manager):
+    manager.update_coupon_status('COUPON-A', 'used', '2024-01-01 10:00:00')
+
+    assert manager.compact_status_log()
+
+    assert os.path.getsize(manager.status_log_file) == 0
+    rows = read_coupon_rows(manager)
+    assert rows['COUPON-A']['status'] == 'used'
+    assert rows['COUPON-A']['used_at'] == '2024-01-01 10:00:00'
+    assert rows['COUPON-B']['status'] == 'generated'
+
+    with open(manager.coupons_file, newline='', encoding='utf-8') as f:
+        assert next(csv.reader(f)) == COUPON_FIELDNAMES
+
+    # Lookups read the same answer straight from the compacted file
+    assert manager.find_coupon('COUPON-A').status == 'used'
+    assert manager.get_coupon_stats()['used'] == 1
+
+
+def test_update_compacts_past_threshold(manager, monkeypatch):
+    monkeypatch.setattr('src.data.STATUS_LOG_COMPACT_BYTES', 0)
+
+    assert manager.update_coupon_status('COUPON-B', 'used', '2024-01-03 12:00:00')
+
+    assert os.path.getsize(manager.status_log_file) == 0
+    assert read_coupon_rows(manager)['COUPON-B']['status'] == 'used'
+
+
+def test_reset_removes_status_log(manager):
+    manager.update_coupon_status('COUPON-A', 'used')
+    assert os.path.exists(manager.status_log_file)
+
+    assert manager.reset_coupons_for_fresh_upload()
+
+    assert not os.path.exists(manager.status_log_file)
+    assert manager.find_coupon('COUPON-A') is None
+    assert manager.get_coupon_stats()['total'] == 0
+
+    # A coupon reusing an old ID must not pick up the discarded status
+    manager.save_coupon(CouponRecord('Alice', 'alice@example.com', 'COUPON-A', '333333'))
+    assert manager.find_coupon('COUPON-A').status == 'generated'
+    assert manager.load_coupon_index()['alice@example.com']['status'] == 'generated'